@@ -196,3 +196,17 @@ def test(ctx: Context, *cli_args: str, snapshot: str = "report") -> None:  # noq
         ).add_args(*args),
         title=pyprefix("Running tests"),
     )
+
+
+@duty
+def benchmark(ctx: Context, *cli_args: str, size: str = "small", baseline: str = "") -> None:
+    """Benchmark the handler on synthetic packages.
+
+    Parameters:
+        size: The size of the generated package: small, medium or large.
+        baseline: A JSON file to compare results to. It is created with the results when it does not exist.
+    """
+    args = [sys.executable, "scripts/benchmark.py", f"--size={size}", *cli_args]
+    if baseline:
+        args.append(f"--compare={baseline}" if Path(baseline).exists() else f"--save={baseline}")
+    ctx.run(args, title=pyprefix("Running benchmarks"), capture=False)
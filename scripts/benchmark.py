@@ -0,0 +1,295 @@
+# Benchmark the handler's collection and rendering hot paths on synthetic packages.
+#
+# Usage: python scripts/benchmark.py [--size small|medium|large] [--save FILE] [--compare FILE]
+#
+# Each benchmark runs once to warm up, then several times: the median and minimum times are reported
+# along with the spread of the measurements. Results can be saved as a baseline,
+# and later runs compared against it, for example before and after a commit.
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from markdown import Markdown
+
+from mkdocstrings_handlers.python import PythonConfig, PythonHandler
+from mkdocstrings_handlers.python._internal import rendering
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from griffe import Alias, Object
+
+
+@dataclass(frozen=True)
+class _Shape:
+    modules: int
+    classes: int
+    methods: int
+    depth: int
+    parameters: int
+
+
+_SIZES = {
+    "small": _Shape(modules=3, classes=4, methods=5, depth=2, parameters=5),
+    "medium": _Shape(modules=20, classes=10, methods=20, depth=5, parameters=10),
+    "large": _Shape(modules=50, classes=20, methods=40, depth=8, parameters=20),
+}
+
+_PACKAGE = "benchmark_package"
+
+
+def _generate(root: Path, shape: _Shape) -> None:
+    # Many modules, each with a deep inheritance chain of wide classes,
+    # functions with long signatures, and every public object re-exported from the package.
+    package = root / _PACKAGE
+    package.mkdir()
+    exports = []
+    for module_index in range(shape.modules):
+        module = f"module{module_index}"
+        parameters = ", ".join(f"param{index}: dict[str, int] | None = None" for index in range(shape.parameters))
+        lines = [f'"""Module {module_index}."""', ""]
+        for class_index in range(shape.classes):
+            name = f"Class{module_index}_{class_index}"
+            base = f"Class{module_index}_{class_index - 1}" if class_index % shape.depth else ""
+            lines.append(f"class {name}({base}):")
+            lines.append(f'    """Class {class_index}.\n\n    Attributes:\n        value: A value.\n    """')
+            lines.append("    value: int = 0")
+            for method_index in range(shape.methods):
+                lines.append(f"    def method{class_index}_{method_index}(self, {parameters}) -> list[{name}]:")
+                lines.append(
+                    '        """Do something.\n\n        Parameters:\n            param0: A parameter.\n\n'
+                    '        Returns:\n            Some objects.\n        """',
+                )
+            lines.append("")
+            exports.append((module, name))
+        lines.append(f"def function{module_index}({parameters}) -> None:")
+        lines.append('    """Do something else."""')
+        lines.append("")
+        exports.append((module, f"function{module_index}"))
+        package.joinpath(f"{module}.py").write_text("\n".join(lines), encoding="utf8")
+    init = [f"from {_PACKAGE}.{module} import {name}" for module, name in exports]
+    init.append(f"__all__ = {[name for _, name in exports]!r}")
+    package.joinpath("__init__.py").write_text("\n".join(init) + "\n", encoding="utf8")
+
+
+def _handler(root: Path) -> PythonHandler:
+    handler = PythonHandler(
+        theme="material",
+        custom_templates=None,
+        base_dir=root,
+        config=PythonConfig.from_data(paths=[str(root)]),
+        mdx=["toc"],
+        mdx_config={},
+    )
+    handler._update_env(Markdown(), config={})
+    return handler
+
+
+def _objects(obj: Object | Alias) -> Iterator[Object | Alias]:
+    yield obj
+    if not obj.is_alias:
+        for member in obj.members.values():
+            yield from _objects(member)
+
+
+def _bench_collect(root: Path) -> Callable[[], int]:
+    def run() -> int:
+        handler = _handler(root)
+        return sum(1 for _ in _objects(handler.collect(_PACKAGE, handler.get_options({}))))
+
+    return run
+
+
+def _bench_render(root: Path, options: dict[str, Any]) -> Callable[[], int]:
+    # Templates are compiled once, but nothing else is reused between runs:
+    # neither rendered members nor formatted signatures.
+    handler = _handler(root)
+    handler_options = handler.get_options(options)
+    package = handler.collect(_PACKAGE, handler_options)
+
+    def run() -> int:
+        handler._headings.clear()
+        handler._rendering_memo.entries.clear()
+        rendering._signatures_memo.entries.clear()
+        handler.render(package, handler_options)
+        return len(handler._headings)
+
+    return run
+
+
+def _bench_filter(root: Path) -> Callable[[], int]:
+    handler = _handler(root)
+    options = handler.get_options({"inherited_members": True})
+    package = handler.collect(_PACKAGE, options)
+    parents = [obj for obj in _objects(package) if not obj.is_alias and (obj.is_module or obj.is_class)]
+
+    def run() -> int:
+        count = 0
+        for parent in parents:
+            members = rendering.do_filter_objects(
+                parent.all_members,
+                filters=options.filters,
+                inherited_members=True,
+                keep_no_docstrings=False,
+            )
+            count += len(rendering.do_order_members(members, "alphabetical", None))
+        return count
+
+    return run
+
+
+def _stashed_signature(parameters: int) -> tuple[str, dict[str, str]]:
+    # A highlighted signature, with a stashed cross-reference for the annotation of each parameter.
+    stash_filter = rendering._StashCrossRefFilter()
+    lines = []
+    for index in range(parameters):
+        title = f"Type{index}"
+        key = stash_filter(f'<autoref identifier="package.{title}" optional>{title}</autoref>', length=len(title))
+        lines.append(
+            f'    <span class="n">param{index}</span><span class="p">:</span> <span class="n">{key}</span>'
+            '<span class="p">,</span>',
+        )
+    stash = dict(stash_filter.stash)
+    stash_filter.stash.clear()
+    return '<span class="nf">function</span><span class="p">(</span>\n' + "\n".join(lines) + "\n)", stash
+
+
+def _restore_crossrefs_per_key(signature: str, stash: dict[str, str]) -> str:
+    # The previous implementation, kept as a reference: one `re.sub` per key, each one scanning the whole signature.
+    for key, value in stash.items():
+        signature = re.sub(rf"\b{key}\b", value, signature)
+    return signature
+
+
+def _bench_crossrefs(restore: Callable[[str, dict[str, str]], str]) -> Callable[[Path], Callable[[], int]]:
+    # Cross-references are restored in every signature, including memoized ones.
+    # Signatures with 50 annotated parameters show the difference between implementations.
+    def bench(root: Path) -> Callable[[], int]:  # noqa: ARG001
+        signatures = [_stashed_signature(50) for _ in range(20)]
+        for signature, stash in signatures:
+            assert restore(signature, stash) == _restore_crossrefs_per_key(signature, stash)  # noqa: S101
+
+        def run() -> int:
+            for signature, stash in signatures:
+                restore(signature, stash)
+            return sum(len(stash) for _, stash in signatures)
+
+        return run
+
+    return bench
+
+
+_BENCHMARKS: dict[str, Callable[[Path], Callable[[], int]]] = {
+    "collect": _bench_collect,
+    "render": lambda root: _bench_render(root, {"show_submodules": True}),
+    "render signatures": lambda root: _bench_render(
+        root,
+        {"show_submodules": True, "separate_signature": True, "show_signature_annotations": True},
+    ),
+    "filter and order": _bench_filter,
+    "restore crossrefs": _bench_crossrefs(rendering._restore_crossrefs),
+    "per-key crossrefs": _bench_crossrefs(_restore_crossrefs_per_key),
+}
+
+# Benchmarks of previous implementations, reported next to the current ones.
+_REFERENCES = {"restore crossrefs": "per-key crossrefs"}
+
+
+def _measure(run: Callable[[], int], repeat: int) -> dict[str, float]:
+    # Like `timeit`, the garbage collector is disabled while measuring.
+    count = run()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    median = statistics.median(times)
+    return {
+        "items": count,
+        "min": min(times),
+        "median": median,
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "throughput": count / median,
+    }
+
+
+def _compare(results: dict[str, dict[str, float]], baseline: dict[str, Any], threshold: float) -> bool:
+    # Compare minimums, the least noisy statistic,
+    # and report benchmarks slower than the baseline by more than the threshold.
+    regressed = False
+    print(f"\nCompared to baseline ({baseline['python']}, {baseline['size']}):")
+    for name, result in results.items():
+        if (previous := baseline["results"].get(name)) is None:
+            continue
+        change = result["min"] / previous["min"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{name:>20}: {previous['min'] * 1000:9.1f} ms -> {result['min'] * 1000:9.1f} ms ({change:+.1%}){flag}",
+        )
+    return regressed
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Python handler on synthetic packages.")
+    parser.add_argument("--size", choices=_SIZES, default="small", help="The size of the generated package.")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of measured runs per benchmark.")
+    parser.add_argument("--only", action="append", choices=_BENCHMARKS, help="The benchmarks to run (all by default).")
+    parser.add_argument("--save", type=Path, help="Save results to this JSON file, to use it as a baseline.")
+    parser.add_argument("--compare", type=Path, help="Compare results to the baseline saved in this JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown reported as a regression (0.1: 10%%).")
+    opts = parser.parse_args(args)
+
+    shape = _SIZES[opts.size]
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="mkdocstrings-python-benchmark-") as tmpdir:
+        root = Path(tmpdir)
+        _generate(root, shape)
+        print(f"Package: {opts.size} ({', '.join(f'{key}={value}' for key, value in asdict(shape).items())})")
+        for name in opts.only or _BENCHMARKS:
+            result = results[name] = _measure(_BENCHMARKS[name](root), opts.repeat)
+            print(
+                f"{name:>20}: {result['median'] * 1000:9.1f} ms median "
+                f"(min {result['min'] * 1000:.1f} ms, stdev {result['stdev'] * 1000:.1f} ms), "
+                f"{result['throughput']:,.0f} items/s",
+            )
+        for name, reference in _REFERENCES.items():
+            if name in results and reference in results:
+                speedup = results[reference]["median"] / results[name]["median"]
+                print(f"{name:>20}: {speedup:.1f}x faster than {reference}")
+
+    data = {"python": platform.python_version(), "size": opts.size, "shape": asdict(shape), "results": results}
+    if opts.save:
+        opts.save.parent.mkdir(parents=True, exist_ok=True)
+        opts.save.write_text(json.dumps(data, indent=2), encoding="utf8")
+    if opts.compare:
+        baseline = json.loads(opts.compare.read_text(encoding="utf8"))
+        if baseline["size"] != opts.size:
+            print(f"Baseline was measured on a {baseline['size']} package, not {opts.size}")
+            return 2
+        if _compare(results, baseline, opts.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,585 @@
+# This module implements an on-disk cache for collected packages.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, cast
+from xml.etree.ElementTree import Element, fromstring, tostring
+
+from griffe import Alias, AliasResolutionError, CyclicAliasError, ModuleFinder, NamespacePackage, Object, visit
+from mkdocstrings import InventoryItem, get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Iterable, Iterator, Mapping
+
+    from griffe import GriffeLoader, LinesCollection, Module, ModulesCollection
+
+
+_logger = get_logger(__name__)
+
+# Bump this number when the format of cache files changes.
+_CACHE_FORMAT = 3
+
+_Fingerprint = dict[str, tuple[int, int]]
+
+_LOAD_EVENTS = (
+    "on_alias",
+    "on_object",
+    "on_module",
+    "on_class",
+    "on_function",
+    "on_attribute",
+    "on_type_alias",
+)
+
+
+def _tmp_path(path: Path) -> Path:
+    # Files are written next to their destination, then moved atomically.
+    # Temporary names are unique per process and thread, so that concurrent builds
+    # sharing the cache directory never write to the same file.
+    return path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+def _griffe_version() -> str:
+    try:
+        return version("griffelib")
+    except PackageNotFoundError:
+        return version("griffe")
+
+
+def _cache_key(**data: Any) -> str:
+    data = {**data, "format": _CACHE_FORMAT, "griffe": _griffe_version(), "python": sys.version}
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _fingerprint(finder: ModuleFinder, module_name: str, *, find_stubs_package: bool) -> _Fingerprint | None:
+    # Packages that cannot be found on the disk are inspected, and never cached.
+    try:
+        _, package = finder.find_spec(module_name, try_relative_path=False, find_stubs_package=find_stubs_package)
+    except ModuleNotFoundError:
+        return None
+    if isinstance(package, NamespacePackage):
+        filepaths = [filepath for _, filepath in finder.iter_submodules(package.path)]
+    else:
+        filepaths = [package.path, *(filepath for _, filepath in finder.iter_submodules(package.path))]
+        if package.stubs:
+            filepaths.append(package.stubs)
+            filepaths.extend(filepath for _, filepath in finder.iter_submodules(package.stubs))
+    fingerprint = {}
+    for filepath in filepaths:
+        stat = filepath.stat()
+        fingerprint[str(filepath)] = (stat.st_mtime_ns, stat.st_size)
+    return fingerprint
+
+
+def _top_module(obj: Object | Alias) -> Object | Alias:
+    while obj.parent is not None:
+        obj = obj.parent
+    return obj
+
+
+class _Pickler(pickle.Pickler):
+    # Collections and objects from other packages are not serialized,
+    # they are stored as references and resolved again when loading.
+    # Back-references between packages (aliases targeting another package,
+    # and aliases from another package registered on their targets) are left out entirely,
+    # so that packages importing from each other can be loaded in any order:
+    # they are registered again when aliases are resolved after loading.
+    def __init__(
+        self,
+        file: BinaryIO,
+        packages: Iterable[Module],
+        modules_collection: ModulesCollection,
+        lines_collection: LinesCollection,
+    ) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._packages = {id(package) for package in packages}
+        self._modules_collection = modules_collection
+        self._lines_collection = lines_collection
+
+    def persistent_id(self, obj: Any) -> str | None:
+        if obj is self._modules_collection:
+            return "modules"
+        if obj is self._lines_collection:
+            return "lines"
+        if isinstance(obj, (Object, Alias)) and not self._owns(obj):
+            return f"object:{obj.path}"
+        return None
+
+    def reducer_override(self, obj: Any) -> Any:
+        # Only called for objects of the stored packages, other ones being persistent references.
+        if isinstance(obj, Alias):
+            if obj._target is not None and not self._owns(obj._target):
+                return self._reduce(obj, _target=None)
+        elif isinstance(obj, Object) and obj.aliases:
+            aliases = {path: alias for path, alias in obj.aliases.items() if self._owns(alias)}
+            if len(aliases) != len(obj.aliases):
+                return self._reduce(obj, aliases=aliases)
+        return NotImplemented
+
+    def _owns(self, obj: Object | Alias) -> bool:
+        return id(_top_module(obj)) in self._packages
+
+    @staticmethod
+    def _reduce(obj: Object | Alias, **state: Any) -> tuple:
+        func, args, obj_state, *rest = cast("tuple", obj.__reduce_ex__(pickle.HIGHEST_PROTOCOL))
+        return (func, args, {**obj_state, **state}, *rest)
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(
+        self,
+        file: BinaryIO,
+        modules_collection: ModulesCollection,
+        lines_collection: LinesCollection,
+    ) -> None:
+        super().__init__(file)
+        self._modules_collection = modules_collection
+        self._lines_collection = lines_collection
+
+    def persistent_load(self, pid: str) -> Any:
+        if pid == "modules":
+            return self._modules_collection
+        if pid == "lines":
+            return self._lines_collection
+        return self._modules_collection.get_member(pid.removeprefix("object:"))
+
+
+def _dependencies(package: Module) -> list[str]:
+    # The other top-level packages targeted by aliases of a package. Loading a package can depend on them:
+    # wildcard imports and exports are expanded against them, and extensions can use their objects
+    # (for example the parameters of dataclasses inheriting from their classes).
+    names = {member.target_path.split(".", 1)[0] for member in _iter_objects(package) if isinstance(member, Alias)}
+    names.discard(package.path)
+    return sorted(names)
+
+
+class _ModulesCache:
+    # Each top-level package is stored in its own file, along with the key and the fingerprint
+    # of its source files, and the fingerprints of the packages it depends on.
+    def __init__(
+        self,
+        cache_dir: Path,
+        modules_collection: ModulesCollection,
+        lines_collection: LinesCollection,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.modules_collection = modules_collection
+        self.lines_collection = lines_collection
+
+    def _path(self, module_name: str) -> Path:
+        return self.cache_dir / f"{module_name}.pickle"
+
+    def load(
+        self,
+        module_name: str,
+        key: str,
+        fingerprint: _Fingerprint,
+        fingerprint_package: Callable[[str], _Fingerprint | None],
+    ) -> list[Path] | None:
+        # Return the list of files that changed since the package was stored
+        # (empty when the package is up-to-date), or None when it cannot be used at all,
+        # for example when one of the packages it depends on changed.
+        # A package with changed files is still loaded, so that it can be updated incrementally.
+        path = self._path(module_name)
+        try:
+            with path.open("rb") as file:
+                stored_key, stored_fingerprint, dependencies = pickle.load(file)  # noqa: S301
+                if stored_key != key or stored_fingerprint.keys() != fingerprint.keys():
+                    return None
+                if changed_dependencies := [
+                    name for name, dependency in dependencies.items() if fingerprint_package(name) != dependency
+                ]:
+                    _logger.debug(f"Not loading {module_name} from cache: {', '.join(changed_dependencies)} changed")
+                    return None
+                module, lines = _Unpickler(file, self.modules_collection, self.lines_collection).load()
+        except FileNotFoundError:
+            return None
+        except Exception as error:  # noqa: BLE001
+            _logger.debug(f"Could not load {module_name} from cache: {error}")
+            return None
+        self.modules_collection.set_member(module.path, module)
+        for filepath, file_lines in lines.items():
+            self.lines_collection[filepath] = file_lines
+        changed = [Path(filepath) for filepath, stat in fingerprint.items() if stored_fingerprint[filepath] != stat]
+        _logger.debug(f"Loaded {module_name} from cache ({len(changed)} changed files)")
+        return changed
+
+    def dump(
+        self,
+        module_name: str,
+        key: str,
+        fingerprint: _Fingerprint,
+        fingerprint_package: Callable[[str], _Fingerprint | None],
+    ) -> None:
+        module = self.modules_collection[module_name]
+        dependencies = {name: fingerprint_package(name) for name in _dependencies(module)}
+        lines = {
+            Path(filepath): self.lines_collection[Path(filepath)]
+            for filepath in fingerprint
+            if Path(filepath) in self.lines_collection
+        }
+        path = self._path(module_name)
+        tmp_path = _tmp_path(path)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("wb") as file:
+                pickle.dump((key, fingerprint, dependencies), file, protocol=pickle.HIGHEST_PROTOCOL)
+                _Pickler(file, [module], self.modules_collection, self.lines_collection).dump((module, lines))
+            tmp_path.replace(path)
+        except Exception as error:  # noqa: BLE001
+            _logger.debug(f"Could not store {module_name} in cache: {error}")
+            tmp_path.unlink(missing_ok=True)
+
+
+def _iter_modules(module: Module) -> Iterator[Module]:
+    yield module
+    for submodule in module.modules.values():
+        if not submodule.is_alias:
+            yield from _iter_modules(submodule)
+
+
+def _iter_aliases(obj: Object) -> Iterator[Alias]:
+    for member in obj.members.values():
+        if member.is_alias:
+            yield member  # type: ignore[misc]
+        elif not member.is_module:
+            yield from _iter_aliases(member)  # type: ignore[arg-type]
+
+
+def _points_into(module: Module, paths: set[str]) -> bool:
+    for alias in _iter_aliases(module):
+        target_path = alias.target_path
+        if target_path in paths or any(target_path.startswith(f"{path}.") for path in paths):
+            return True
+    return False
+
+
+def _fire_load_events(loader: GriffeLoader, obj: Object) -> None:
+    # Same as the loader's own load events, without descending into submodules,
+    # which are either untouched or visited again separately.
+    for member in tuple(obj.members.values()):
+        if member.is_alias:
+            loader.extensions.call("on_alias", alias=member, loader=loader)
+            continue
+        if member.is_module:
+            continue
+        loader.extensions.call("on_object", obj=member, loader=loader)
+        if member.is_class:
+            loader.extensions.call("on_class", cls=member, loader=loader)
+        elif member.is_function:
+            loader.extensions.call("on_function", func=member, loader=loader)
+        elif member.is_attribute:
+            loader.extensions.call("on_attribute", attr=member, loader=loader)
+        elif member.is_type_alias:
+            loader.extensions.call("on_type_alias", type_alias=member, loader=loader)
+        _fire_load_events(loader, member)  # type: ignore[arg-type]
+
+
+def _revisit_modules(loader: GriffeLoader, package: Module, filepaths: list[Path]) -> bool:
+    # Visit again the modules backed by the given files, as well as the modules
+    # whose aliases point into them (exports and wildcard imports were expanded
+    # against the previous objects), and swap them into the package.
+    # Return false without touching the package when this is not possible,
+    # in which case the whole package must be loaded again.
+    if loader.force_inspection:
+        return False
+    modules = {module.filepath: module for module in _iter_modules(package) if isinstance(module.filepath, Path)}
+    stale: dict[str, Module] = {}
+    for filepath in filepaths:
+        # Stubs are merged into regular modules, and cannot be visited separately.
+        if filepath not in modules or filepath.suffix != ".py" or filepath.with_suffix(".pyi").exists():
+            return False
+        stale[modules[filepath].path] = modules[filepath]
+    while dependents := {
+        module.path: module
+        for module in modules.values()
+        if module.path not in stale and _points_into(module, set(stale))
+    }:
+        stale.update(dependents)
+
+    # Visit all modules first, parents before children, so that a syntax error
+    # leaves the package untouched.
+    visited: dict[str, Module] = {}
+    try:
+        for path in sorted(stale, key=lambda path: path.count(".")):
+            old_module = stale[path]
+            filepath = cast("Path", old_module.filepath)
+            code = filepath.read_text(encoding="utf-8-sig")
+            if loader.store_source:
+                loader.lines_collection[filepath] = code.splitlines(keepends=False)
+            parent = cast("Module | None", old_module.parent)
+            visited[path] = visit(
+                old_module.name,
+                filepath=filepath,
+                code=code,
+                extensions=loader.extensions,
+                parent=parent and visited.get(parent.path, parent),
+                docstring_parser=loader.docstring_parser,
+                docstring_options=loader.docstring_options,
+                lines_collection=loader.lines_collection,
+                modules_collection=loader.modules_collection,
+            )
+    except (OSError, SyntaxError, UnicodeDecodeError) as error:
+        _logger.debug(f"Could not visit modules of {package.path} again: {error}")
+        return False
+
+    for path, module in visited.items():
+        old_module = stale[path]
+        for name, member in old_module.members.items():
+            if not member.is_alias and member.is_module:
+                module.set_member(name, visited.get(member.path, member))
+        if module.parent is None:
+            module.git_info = old_module.git_info
+            loader.modules_collection.set_member(path, module)
+        else:
+            module.parent.set_member(module.name, module)
+    package = loader.modules_collection[package.path]
+    loader.expand_exports(package)
+    loader.expand_wildcards(package, external=False)
+    loader.extensions.call("on_package", pkg=package, loader=loader)
+    if loader.extensions.has_hooks(*_LOAD_EVENTS):
+        for module in visited.values():
+            loader.extensions.call("on_object", obj=module, loader=loader)
+            loader.extensions.call("on_module", mod=module, loader=loader)
+            _fire_load_events(loader, module)
+    _logger.debug(f"Visited {len(visited)} modules of {package.path} again")
+    return True
+
+
+def _render_fingerprint(obj: Object | Alias, digests: Mapping[str, str | None]) -> str | None:
+    # Fingerprint everything that can end up in the rendered HTML of an object:
+    # the packages of its subtree, of the targets of aliases and of the bases of classes
+    # found in this subtree (for inherited members), through the digests of these packages
+    # (their loading key and the fingerprint of their source files, like the modules cache).
+    # Return None when a package has no digest, in which case the object is not cached.
+    hasher = hashlib.sha256(obj.path.encode())
+    packages: set[str] = set()
+    visited: set[str] = set()
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if current.path in visited:
+            continue
+        visited.add(current.path)
+        if isinstance(current, Alias):
+            try:
+                stack.append(current.final_target)
+            except (AliasResolutionError, CyclicAliasError):
+                hasher.update(f"unresolved:{current.path}".encode())
+            continue
+        packages.add(_top_module(current).path)
+        for member in _iter_objects(current):
+            if isinstance(member, Alias):
+                stack.append(member)
+                continue
+            visited.add(member.path)
+            if member.is_class:
+                try:
+                    stack.extend(member.mro())  # type: ignore[attr-defined]
+                except Exception:  # noqa: BLE001
+                    hasher.update(f"unresolved-bases:{member.path}".encode())
+    for package in sorted(packages):
+        if (digest := digests.get(package)) is None:
+            return None
+        hasher.update(f"{package}:{digest}".encode())
+    return hasher.hexdigest()
+
+
+def _iter_objects(obj: Object) -> Iterator[Object | Alias]:
+    yield obj
+    for member in obj.members.values():
+        if member.is_alias:
+            yield member
+        else:
+            yield from _iter_objects(member)  # type: ignore[arg-type]
+
+
+class _FragmentsCache:
+    # Each rendered object is stored in its own file, named after its key,
+    # along with the headings registered while rendering it,
+    # so that they can be registered again when the fragment is reused.
+    # Fragments neither stored nor reused by a build are deleted at the end of it,
+    # unless they were used by another build since this one started.
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+        self.used: set[str] = set()
+        self.started = time.time()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pickle"
+
+    def load(self, key: str) -> tuple[str, list[Element]] | None:
+        path = self._path(key)
+        try:
+            with path.open("rb") as file:
+                html, headings = pickle.load(file)  # noqa: S301
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as error:  # noqa: BLE001
+            _logger.debug(f"Could not load rendered fragment {key} from cache: {error}")
+            return None
+        self.used.add(key)
+        return html, [fromstring(heading) for heading in headings]  # noqa: S314
+
+    def dump(self, key: str, html: str, headings: Iterable[Element]) -> None:
+        self.used.add(key)
+        path = self._path(key)
+        tmp_path = _tmp_path(path)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("wb") as file:
+                data = (html, [tostring(heading, encoding="unicode") for heading in headings])
+                pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(path)
+        except Exception as error:  # noqa: BLE001
+            _logger.debug(f"Could not store rendered fragment {key} in cache: {error}")
+            tmp_path.unlink(missing_ok=True)
+
+    def prune(self) -> None:
+        # Builds that rendered nothing (for example failed ones) keep all fragments.
+        if not self.used:
+            return
+        pruned = 0
+        for path in self.cache_dir.glob("*.pickle"):
+            try:
+                if path.stem not in self.used and path.stat().st_mtime < self.started:
+                    path.unlink()
+                    pruned += 1
+            except OSError:
+                continue
+        _logger.debug(f"Deleted {pruned} unused rendered fragments from cache")
+
+
+# Bump this number when the format of inventory indexes changes.
+_INVENTORY_INDEX_FORMAT = 1
+
+
+def _parse_inventory(data: bytes) -> Iterator[tuple[str, str, str]]:
+    # Same as `Inventory.parse_sphinx`, without building items or filtering domains.
+    lines = data.split(b"\n", 4)
+    for line in zlib.decompress(lines[4] if len(lines) > 4 else b"").splitlines():  # noqa: PLR2004
+        if item := InventoryItem.parse_sphinx(line.decode("utf8"), return_none=True):
+            yield item.domain, item.name, item.uri
+
+
+def _write_inventory_index(path: Path, digest: str, data: bytes) -> None:
+    # One line per item, in the order of the inventory: domain, URI and name separated by tabs
+    # (the name comes last since it is the only field that can contain whitespace),
+    # after a header made of the index format and the hash of the inventory file.
+    tmp_path = _tmp_path(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_path.open("w", encoding="utf8", newline="\n") as file:
+            file.write(f"{_INVENTORY_INDEX_FORMAT} {digest}\n")
+            file.writelines(f"{domain}\t{uri}\t{name}\n" for domain, name, uri in _parse_inventory(data))
+        tmp_path.replace(path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _read_inventory_index(path: Path, digest: str, domains: Collection[str]) -> dict[str, str] | None:
+    # Read items of the given domains from the index,
+    # keeping the last URI of each name, like `Inventory.parse_sphinx`.
+    wanted = set(domains)
+    items: dict[str, str] = {}
+    with path.open(encoding="utf8", newline="\n") as file:
+        if file.readline() != f"{_INVENTORY_INDEX_FORMAT} {digest}\n":
+            return None
+        for line in file:
+            domain, uri, name = line.rstrip("\n").split("\t", 2)
+            if domain in wanted:
+                items[name] = uri
+    return items
+
+
+def _inventory_index_path(index_dir: Path, url: str) -> Path:
+    return index_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.index"
+
+
+def _load_inventory_index(index_dir: Path, url: str, data: bytes, domains: Collection[str]) -> dict[str, str]:
+    # Inventories are indexed once per URL, and indexed again when their contents change.
+    path = _inventory_index_path(index_dir, url)
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        if (items := _read_inventory_index(path, digest, domains)) is not None:
+            return items
+    except FileNotFoundError:
+        pass
+    except Exception as error:  # noqa: BLE001
+        _logger.debug(f"Could not read index of inventory {url}: {error}")
+    try:
+        _write_inventory_index(path, digest, data)
+        items = _read_inventory_index(path, digest, domains)
+    except Exception as error:  # noqa: BLE001
+        _logger.debug(f"Could not index inventory {url}: {error}")
+        items = None
+    if items is None:
+        wanted = set(domains)
+        items = {name: uri for domain, name, uri in _parse_inventory(data) if domain in wanted}
+    return items
+
+
+# Downloaded inventories are reused for a day, like mkdocstrings does.
+_INVENTORY_MAX_AGE = 86400
+
+
+def _inventory_copies(directory: Path, url: str) -> list[Path]:
+    # Local copies are named after the URL and their contents, most recent first.
+    prefix = hashlib.sha256(url.encode()).hexdigest()
+    return sorted(directory.glob(f"{prefix}-*.inv"), key=lambda path: path.stat().st_mtime, reverse=True)
+
+
+def _remote(url: str) -> bool:
+    # Inventories at HTTP(S) URLs are downloaded, other ones are local files.
+    return urllib.parse.urlsplit(url).scheme in {"http", "https"}
+
+
+def _fetchable(url: str) -> bool:
+    # Only copies of remote inventories are stored, not of URLs with credentials (possibly from environment variables).
+    return _remote(url) and "@" not in urllib.parse.urlsplit(url).netloc
+
+
+def _inventory_copy(directory: Path, url: str, *, offline: bool) -> Path | None:
+    # Return the last local copy of the inventory, unless it is outdated (in which case it is downloaded again).
+    copies = _inventory_copies(directory, url)
+    if copies and (offline or time.time() - copies[0].stat().st_mtime < _INVENTORY_MAX_AGE):
+        return copies[0]
+    return None
+
+
+def _store_inventory(directory: Path, url: str, data: bytes) -> Path | None:
+    # Store a local copy of an inventory downloaded by mkdocstrings, replacing the previous ones.
+    # Its name changes with its contents, so that mkdocstrings (and MkDocs' own cache) never read a stale copy.
+    copies = _inventory_copies(directory, url)
+    digest = hashlib.sha256(data).hexdigest()
+    path = directory / f"{hashlib.sha256(url.encode()).hexdigest()}-{digest[:16]}.inv"
+    if path.exists():
+        path.touch()
+    else:
+        tmp_path = _tmp_path(path)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        except OSError as error:
+            tmp_path.unlink(missing_ok=True)
+            _logger.debug(f"Could not store inventory {url}: {error}")
+            return None
+    for copy in copies:
+        if copy != path:
+            copy.unlink(missing_ok=True)
+            _inventory_index_path(directory, copy.as_uri()).unlink(missing_ok=True)
+    return path
@@ -1109,6 +1109,11 @@ class PythonInputConfig:
         _Field(description="The inventories to load."),
     ] = field(default_factory=list)
 
+    offline: Annotated[
+        bool,
+        _Field(description="Whether to load inventories from the cache directory only, without downloading them."),
+    ] = False
+
     paths: Annotated[
         list[str],
         _Field(description="The paths in which to search for Python packages."),
@@ -1119,6 +1124,23 @@ class PythonInputConfig:
         _Field(description="Whether to always load external modules/packages."),
     ] = None
 
+    cache_dir: Annotated[
+        str | None,
+        _Field(description="The directory in which to cache collected data between builds."),
+    ] = None
+
+    collection_workers: Annotated[
+        int,
+        _Field(description="The number of processes used to load independent packages concurrently."),
+    ] = 1
+
+    profile: Annotated[
+        str | None,
+        _Field(
+            description="The file in which to write a JSON report of where build time goes. Also logs a summary table.",
+        ),
+    ] = None
+
     options: Annotated[
         PythonInputOptions,
         _Field(description="Configuration options for collecting and rendering objects."),
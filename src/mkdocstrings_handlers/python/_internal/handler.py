@@ -3,19 +3,25 @@
 from __future__ import annotations
 
 import glob
+import hashlib
 import inspect
+import json
 import os
 import posixpath
 import sys
+import threading
 from contextlib import suppress
 from dataclasses import asdict
+from functools import cache, partial
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, BinaryIO, Callable, ClassVar
+from weakref import WeakKeyDictionary
 
 from griffe import (
     AliasResolutionError,
     GriffeLoader,
     LinesCollection,
+    LoadingError,
     ModulesCollection,
     Parser,
     load_extensions,
@@ -25,16 +31,33 @@ from griffe import (
     parse_sphinx,
     patch_loggers,
 )
+from jinja2 import FileSystemBytecodeCache
 from mkdocs.exceptions import PluginError
 from mkdocs_autorefs import BacklinkCrumb
 from mkdocstrings import BaseHandler, CollectionError, CollectorItem, HandlerOptions, Inventory, get_logger
 
-from mkdocstrings_handlers.python._internal import rendering
+from mkdocstrings_handlers.python._internal import profiling, rendering
+from mkdocstrings_handlers.python._internal.cache import (
+    _cache_key,
+    _fetchable,
+    _Fingerprint,
+    _fingerprint,
+    _FragmentsCache,
+    _inventory_copy,
+    _load_inventory_index,
+    _ModulesCache,
+    _remote,
+    _render_fingerprint,
+    _revisit_modules,
+    _store_inventory,
+)
 from mkdocstrings_handlers.python._internal.config import PythonConfig, PythonOptions
+from mkdocstrings_handlers.python._internal.parallel import _can_load_concurrently, _load_packages_concurrently
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Iterator, Mapping, MutableMapping, Sequence
 
+    from griffe import Docstring, DocstringSection
     from mkdocs.config.defaults import MkDocsConfig
     from mkdocs_autorefs import Backlink
 
@@ -67,6 +90,51 @@ _PARSER_FUNCTIONS: dict[Parser, Callable] = {
 }
 
 
+def _options_key(options: Mapping[str, Any]) -> str | None:
+    # Options that cannot be serialized (objects passed from Python hooks, for example)
+    # are never cached, since their representation may not identify them.
+    try:
+        data = json.dumps(options, sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _parsing_key(docstring: Docstring, parser: str | None, parser_options: Mapping[str, Any]) -> tuple | None:
+    if (options_key := _options_key(parser_options)) is None:
+        return None
+    return docstring.value, parser, options_key
+
+
+def _apply_parser(
+    parsed: WeakKeyDictionary[Docstring, dict[tuple, list[DocstringSection]]],
+    docstring: Docstring,
+    parser: Parser | None,
+    parser_options: dict[str, Any],
+) -> None:
+    # `Docstring.parsed` is a cached property, computed only when templates access it.
+    # Sections parsed with other settings are kept aside, and reused when these settings
+    # are applied again, instead of parsing the same docstring again.
+    sections = parsed.setdefault(docstring, {})
+    if (current := docstring.__dict__.pop("parsed", None)) is not None and (
+        key := _parsing_key(docstring, docstring.parser, docstring.parser_options)
+    ) is not None:
+        sections[key] = current
+    docstring.parser = parser
+    docstring.parser_options = parser_options  # type: ignore[assignment]
+    if (key := _parsing_key(docstring, parser, parser_options)) is not None and key in sections:
+        docstring.__dict__["parsed"] = sections[key]
+
+
+def _get_parser(options: PythonOptions) -> tuple[Parser | None, dict[str, Any] | None]:
+    parser_name = options.docstring_style
+    parser = parser_name and Parser(parser_name)
+    parser_options: dict[str, Any] | None = None
+    if options.docstring_options is not None:
+        parser_options = _filter_parser_options(parser, asdict(options.docstring_options))
+    return parser, parser_options
+
+
 def _filter_parser_options(parser: Parser | None, options: dict[str, Any] | None) -> dict[str, Any] | None:
     """Filter options unsupported by the selected Griffe parser."""
     if parser is None or options is None:
@@ -157,10 +225,76 @@ class PythonHandler(BaseHandler):
         self._paths = search_paths
         self._modules_collection: ModulesCollection = ModulesCollection()
         self._lines_collection: LinesCollection = LinesCollection()
+        self._loaders: dict[str, GriffeLoader] = {}
+
+        # Options are frozen, so identical local options can share the same instance.
+        self._options: dict[str, PythonOptions] = {}
+        self._options_hits = 0
+        self._options_misses = 0
+
+        # Docstrings collected again with different parser settings keep the sections parsed with previous ones.
+        self._parsed_docstrings: WeakKeyDictionary[Docstring, dict[tuple, list[DocstringSection]]] = WeakKeyDictionary()
+
+        # Collecting and rendering share state (collections, Markdown converter, headings, memos):
+        # calls from several threads are serialized, see the "Concurrency" section of the docs.
+        self._lock = threading.RLock()
+
+        # Build time is measured only when users opt in.
+        self._profiler: profiling._Profiler | None = None
+        self._profile_path: Path | None = None
+        if config.profile:
+            self._profiler = profiling._Profiler()
+            self._profile_path = Path(os.path.abspath(base_dir / config.profile))
+
+        # Objects rendered again in the same context during a build reuse their HTML.
+        self._rendering_memo = rendering._RenderingMemo(self._headings)
+
+        # Packages are cached on the disk only when users opt in.
+        self._modules_cache: _ModulesCache | None = None
+        self._signatures_cache: Path | None = None
+        self._templates_cache: Path | None = None
+        self._fragments_cache: _FragmentsCache | None = None
+        self._fragments_context: str | None = None
+        self._package_digests: dict[str, str | None] = {}
+        self._inventories_cache: Path | None = None
+        if config.cache_dir:
+            cache_dir = Path(os.path.abspath(base_dir / config.cache_dir))
+            self._modules_cache = _ModulesCache(
+                cache_dir / "modules",
+                self._modules_collection,
+                self._lines_collection,
+            )
+            self._signatures_cache = cache_dir / "signatures.pickle"
+            # Jinja validates cached bytecode against the template source and Python version,
+            # but not against its own version.
+            self._templates_cache = cache_dir / "templates" / f"jinja-{rendering._package_version('jinja2')}"
+            rendering._signatures_memo.load(self._signatures_cache)
+            self._fragments_cache = _FragmentsCache(cache_dir / "fragments")
+            self._inventories_cache = cache_dir / "inventories"
+        elif config.offline:
+            _logger.warning("The `offline` option has no effect without a cache directory")
 
     def get_inventory_urls(self) -> list[tuple[str, dict[str, Any]]]:
         """Return the URLs of the inventory files to download."""
-        return [(inv.url, inv._config) for inv in self.config.inventories]
+        if self._inventories_cache is None:
+            return [(inv.url, inv._config) for inv in self.config.inventories]
+        index_dir = str(self._inventories_cache)
+        # Recent local copies of inventories are read instead of downloading them again,
+        # other inventories are downloaded by mkdocstrings, and stored when loading them.
+        # URLs with credentials are left to mkdocstrings, which knows how to expand them,
+        # and are never stored: they are skipped in offline mode, like other remote inventories without a copy.
+        urls = []
+        for inv in self.config.inventories:
+            config = {**inv._config, "index_dir": index_dir}
+            if _fetchable(inv.url) and (
+                path := _inventory_copy(self._inventories_cache, inv.url, offline=self.config.offline)
+            ):
+                urls.append((path.as_uri(), {**config, "base_url": inv.base_url or posixpath.dirname(inv.url)}))
+            elif self.config.offline and _remote(inv.url):
+                _logger.warning(f"No local copy of inventory {inv.url} in offline mode")
+            else:
+                urls.append((inv.url, config))
+        return urls
 
     @staticmethod
     def load_inventory(
@@ -168,6 +302,7 @@ class PythonHandler(BaseHandler):
         url: str,
         base_url: str | None = None,
         domains: list[str] | None = None,
+        index_dir: str | None = None,
         **kwargs: Any,  # noqa: ARG004
     ) -> Iterator[tuple[str, str]]:
         """Yield items and their URLs from an inventory file streamed from `in_file`.
@@ -179,6 +314,8 @@ class PythonHandler(BaseHandler):
             url: The URL that this file is being streamed from (used to guess `base_url`).
             base_url: The URL that this inventory's sub-paths are relative to.
             domains: A list of domain strings to filter the inventory by, when not passed, "py" will be used.
+            index_dir: A directory in which to store a copy of the inventory and an index of it,
+                read instead of the inventory itself as long as the inventory does not change.
             **kwargs: Ignore additional arguments passed from the config.
 
         Yields:
@@ -188,6 +325,16 @@ class PythonHandler(BaseHandler):
         if base_url is None:
             base_url = posixpath.dirname(url)
 
+        if index_dir is not None:
+            # Downloaded inventories are indexed as their local copy, read by the next builds.
+            data = in_file.read()
+            if _fetchable(url) and (path := _store_inventory(Path(index_dir), url, data)):
+                url = path.as_uri()
+            items = _load_inventory_index(Path(index_dir), url, data, domains)
+            for name, uri in items.items():
+                yield name, posixpath.join(base_url, uri)
+            return
+
         for item in Inventory.parse_sphinx(in_file, domain_filter=domains).values():
             yield item.name, posixpath.join(base_url, item.uri)
 
@@ -202,10 +349,18 @@ class PythonHandler(BaseHandler):
         """
         extra = {**self.global_options.get("extra", {}), **local_options.get("extra", {})}
         options = {**self.global_options, **local_options, "extra": extra}
+        key = _options_key(options)
+        if key is not None and key in self._options:
+            self._options_hits += 1
+            return self._options[key]
+        self._options_misses += 1
         try:
-            return PythonOptions.from_data(**options)
+            python_options = PythonOptions.from_data(**options)
         except Exception as error:
             raise PluginError(f"Invalid options: {error}") from error
+        if key is not None:
+            self._options[key] = python_options
+        return python_options
 
     def collect(self, identifier: str, options: PythonOptions) -> CollectorItem:
         """Collect the documentation for the given identifier.
@@ -217,6 +372,10 @@ class PythonHandler(BaseHandler):
         Returns:
             The collected item.
         """
+        with self._lock, profiling._profiling(self._profiler), profiling._measure("collect", identifier):
+            return self._collect(identifier, options)
+
+    def _collect(self, identifier: str, options: PythonOptions) -> CollectorItem:
         module_name = identifier.split(".", 1)[0]
         unknown_module = module_name not in self._modules_collection
         reapply = True
@@ -226,15 +385,66 @@ class PythonHandler(BaseHandler):
             options = self.get_options({})
             reapply = False
 
-        parser_name = options.docstring_style
-        parser = parser_name and Parser(parser_name)
-        parser_options: dict[str, Any] | None = None
-        if options.docstring_options is not None:
-            parser_options = _filter_parser_options(parser, asdict(options.docstring_options))
+        parser, parser_options = _get_parser(options)
 
         if unknown_module:
-            extensions = self.normalize_extension_paths(options.extensions)
-            loader = GriffeLoader(
+            self._load([*options.preload_modules, module_name], options)
+
+        try:
+            doc_object = self._modules_collection[identifier]
+        except KeyError as error:
+            raise CollectionError(f"{identifier} could not be found") from error
+        except AliasResolutionError as error:
+            raise CollectionError(str(error)) from error
+
+        if not unknown_module and reapply:
+            with suppress(AliasResolutionError):
+                if doc_object.docstring is not None:
+                    _apply_parser(self._parsed_docstrings, doc_object.docstring, parser, parser_options or {})
+
+        return doc_object
+
+    def preload(self, identifiers: Iterable[str], options: PythonOptions | None = None) -> None:
+        """Load the packages of the given identifiers at once.
+
+        Objects are otherwise collected one by one, each new package being loaded
+        with its own loader and alias resolution pass. Calling this method beforehand
+        with every identifier that will be collected (for example from a MkDocs hook)
+        loads all their packages with a single loader and a single alias resolution pass.
+        Packages that cannot be loaded are skipped: errors are reported when collecting.
+
+        Parameters:
+            identifiers: The identifiers of the objects that will be collected.
+            options: The options to use for the collection. Default to the global options.
+        """
+        if options is None:
+            options = self.get_options({})
+        with self._lock, profiling._profiling(self._profiler):
+            self._preload(identifiers, options)
+
+    def _preload(self, identifiers: Iterable[str], options: PythonOptions) -> None:
+        module_names = [
+            module_name
+            for module_name in dict.fromkeys(identifier.split(".", 1)[0] for identifier in identifiers)
+            if module_name not in self._modules_collection
+        ]
+        if module_names:
+            self._load([*options.preload_modules, *module_names], options, strict=False)
+
+    def _load(self, module_names: list[str], options: PythonOptions, *, strict: bool = True) -> None:
+        parser, parser_options = _get_parser(options)
+        extensions = self.normalize_extension_paths(options.extensions)
+        # The key is also used to reuse loaders (and their extensions) across packages.
+        cache_key = _cache_key(
+            extensions=extensions,
+            docstring_parser=parser,
+            docstring_options=parser_options,
+            allow_inspection=options.allow_inspection,
+            force_inspection=options.force_inspection,
+            find_stubs_package=options.find_stubs_package,
+        )
+        if (loader := self._loaders.get(cache_key)) is None:
+            loader = self._loaders[cache_key] = GriffeLoader(
                 extensions=load_extensions(*extensions),
                 search_paths=self._paths,
                 docstring_parser=parser,
@@ -244,43 +454,118 @@ class PythonHandler(BaseHandler):
                 allow_inspection=options.allow_inspection,
                 force_inspection=options.force_inspection,
             )
-            try:
-                for pre_loaded_module in options.preload_modules:
-                    if pre_loaded_module not in self._modules_collection:
-                        loader.load(
-                            pre_loaded_module,
-                            try_relative_path=False,
-                            find_stubs_package=options.find_stubs_package,
-                        )
-                loader.load(
-                    module_name,
-                    try_relative_path=False,
-                    find_stubs_package=options.find_stubs_package,
-                )
-            except ImportError as error:
-                raise CollectionError(str(error)) from error
+        try:
+            with profiling._measure("phase", "load packages"):
+                self._load_packages(loader, module_names, cache_key, options, strict=strict)
+        except ImportError as error:
+            raise CollectionError(str(error)) from error
+        with profiling._measure("phase", "resolve aliases"):
             unresolved, iterations = loader.resolve_aliases(
                 implicit=False,
                 external=self.config.load_external_modules,
             )
-            if unresolved:
-                _logger.debug(f"{len(unresolved)} aliases were still unresolved after {iterations} iterations")
-                _logger.debug(f"Unresolved aliases: {', '.join(sorted(unresolved))}")
-
-        try:
-            doc_object = self._modules_collection[identifier]
-        except KeyError as error:
-            raise CollectionError(f"{identifier} could not be found") from error
-        except AliasResolutionError as error:
-            raise CollectionError(str(error)) from error
-
-        if not unknown_module and reapply:
-            with suppress(AliasResolutionError):
-                if doc_object.docstring is not None:
-                    doc_object.docstring.parser = parser
-                    doc_object.docstring.parser_options = parser_options or {}
+        if unresolved:
+            _logger.debug(f"{len(unresolved)} aliases were still unresolved after {iterations} iterations")
+            _logger.debug(f"Unresolved aliases: {', '.join(sorted(unresolved))}")
+        if self._fragments_cache is not None:
+            # Rendered fragments are fingerprinted with the digests of the packages they come from,
+            # including packages loaded while resolving aliases.
+            for module_name in self._modules_collection.members:
+                if module_name not in self._package_digests:
+                    fingerprint = _fingerprint(
+                        loader.finder,
+                        module_name,
+                        find_stubs_package=options.find_stubs_package,
+                    )
+                    self._package_digests[module_name] = (
+                        None if fingerprint is None else _cache_key(loader=cache_key, files=fingerprint)
+                    )
 
-        return doc_object
+    def _load_packages(
+        self,
+        loader: GriffeLoader,
+        module_names: list[str],
+        cache_key: str,
+        options: PythonOptions,
+        *,
+        strict: bool = True,
+    ) -> None:
+        fingerprints: dict[str, _Fingerprint] = {}
+        # Packages are fingerprinted once, whether they are loaded or other packages depend on them.
+        fingerprint_package = cache(partial(_fingerprint, loader.finder, find_stubs_package=options.find_stubs_package))
+        to_load = []
+        for module_name in dict.fromkeys(module_names):
+            if module_name in self._modules_collection:
+                continue
+            if self._modules_cache is not None:
+                fingerprint = fingerprint_package(module_name)
+                if fingerprint is not None:
+                    if self._load_cached_package(loader, module_name, cache_key, fingerprint, fingerprint_package):
+                        continue
+                    fingerprints[module_name] = fingerprint
+            to_load.append(module_name)
+
+        remaining = to_load
+        extensions = self.normalize_extension_paths(options.extensions)
+        if self.config.collection_workers > 1 and len(to_load) > 1:
+            if not _can_load_concurrently(extensions):
+                _logger.debug("Loading packages sequentially, since non-built-in Griffe extensions are configured")
+            else:
+                remaining = _load_packages_concurrently(
+                    loader,
+                    to_load,
+                    workers=self.config.collection_workers,
+                    find_stubs_package=options.find_stubs_package,
+                    extensions=extensions,
+                    search_paths=self._paths,
+                    docstring_parser=loader.docstring_parser,
+                    docstring_options=loader.docstring_options,
+                    allow_inspection=loader.allow_inspection,
+                    force_inspection=loader.force_inspection,
+                )
+        for module_name in remaining:
+            if module_name not in self._modules_collection:
+                try:
+                    loader.load(module_name, try_relative_path=False, find_stubs_package=options.find_stubs_package)
+                except (ImportError, LoadingError) as error:
+                    if strict:
+                        raise
+                    _logger.debug(f"Could not load {module_name}: {error}")
+                    fingerprints.pop(module_name, None)
+
+        if self._modules_cache is not None:
+            for module_name in to_load:
+                if module_name in fingerprints:
+                    self._modules_cache.dump(module_name, cache_key, fingerprints[module_name], fingerprint_package)
+
+    def _load_cached_package(
+        self,
+        loader: GriffeLoader,
+        module_name: str,
+        cache_key: str,
+        fingerprint: _Fingerprint,
+        fingerprint_package: Callable[[str], _Fingerprint | None],
+    ) -> bool:
+        changed = self._modules_cache.load(  # type: ignore[union-attr]
+            module_name,
+            cache_key,
+            fingerprint,
+            fingerprint_package,
+        )
+        if changed == []:
+            return True
+        if changed:
+            # Only the modules backed by changed files are visited again.
+            if _revisit_modules(loader, self._modules_collection[module_name], changed):
+                self._modules_cache.dump(  # type: ignore[union-attr]
+                    module_name,
+                    cache_key,
+                    fingerprint,
+                    fingerprint_package,
+                )
+                return True
+            self._modules_collection.del_member(module_name)
+        return False
 
     def render(self, data: CollectorItem, options: PythonOptions, locale: str | None = None) -> str:
         """Render the collected data.
@@ -293,21 +578,75 @@ class PythonHandler(BaseHandler):
         Returns:
             The rendered data (HTML).
         """
+        with self._lock, profiling._profiling(self._profiler), profiling._measure("render", data.path):
+            return self._render(data, options, locale)
+
+    def _render(self, data: CollectorItem, options: PythonOptions, locale: str | None) -> str:
+        # Unchanged objects rendered with the same options and templates reuse the HTML
+        # stored in the cache directory, and register the same headings again.
+        fragments = self._fragments_cache
+        key = None if fragments is None else self._fragment_key(data, options, locale)
+        if fragments is not None and key is not None and (fragment := fragments.load(key)) is not None:
+            html, headings = fragment
+            self._headings.extend(headings)
+            return html
+        first_heading = len(self._headings)
+
         template_name = rendering.do_get_template(data)
         template = self.env.get_template(template_name)
 
-        return template.render(
-            **{
-                "config": options,
-                data.kind.value.replace(" ", "_"): data,
-                # Heading level is a "state" variable, that will change at each step
-                # of the rendering recursion. Therefore, it's easier to use it as a plain value
-                # than as an item in a dictionary.
-                "heading_level": options.heading_level,
-                "root": True,
-                "locale": locale or "en",
-            },
-        )
+        self._templates.refresh()
+
+        # Each rendering stashes cross-references afresh (stash keys are generated from the stash size),
+        # and signatures are formatted all at once, after the rendering.
+        with (
+            profiling._measure("phase", "render templates"),
+            rendering._isolate_rendering(),
+            rendering._batch_formatting() as batch,
+            rendering._memoize_rendering(self._rendering_memo),
+        ):
+            html = template.render(
+                **{
+                    "config": options,
+                    data.kind.value.replace(" ", "_"): data,
+                    # Heading level is a "state" variable, that will change at each step
+                    # of the rendering recursion. Therefore, it's easier to use it as a plain value
+                    # than as an item in a dictionary.
+                    "heading_level": options.heading_level,
+                    "root": True,
+                    "locale": locale or "en",
+                },
+            )
+        with profiling._measure("phase", "format signatures"):
+            html = batch.apply(html)
+        if fragments is not None and key is not None:
+            fragments.dump(key, html, self._headings[first_heading:])
+        return html
+
+    def _fragment_key(self, data: CollectorItem, options: PythonOptions, locale: str | None) -> str | None:
+        if (fingerprint := _render_fingerprint(data, self._package_digests)) is None:
+            return None
+        if self._fragments_context is None:
+            # Templates cannot change during a build, and are hashed once.
+            hasher = hashlib.sha256()
+            if (loader := self.env.loader) is not None:
+                for name in sorted(self.env.list_templates()):
+                    source, _, _ = loader.get_source(self.env, name)
+                    hasher.update(f"{name}\n{source}\n".encode())
+            self._fragments_context = _cache_key(
+                templates=hasher.hexdigest(),
+                handler=rendering._package_version("mkdocstrings-python"),
+                mkdocstrings=rendering._package_version("mkdocstrings"),
+                # Extensions can be instances: identify them by class and configuration.
+                mdx=[
+                    ext
+                    if isinstance(ext, str)
+                    else [f"{type(ext).__module__}.{type(ext).__qualname__}", ext.getConfigs()]
+                    for ext in self.mdx
+                ],
+                mdx_config=self.mdx_config,
+            )
+        return _cache_key(context=self._fragments_context, options=repr(options), locale=locale, object=fingerprint)
 
     def render_backlinks(self, backlinks: Mapping[str, Iterable[Backlink]], *, locale: str | None = None) -> str:  # noqa: ARG002
         """Render the backlinks.
@@ -327,6 +666,34 @@ class PythonHandler(BaseHandler):
             default_crumb=BacklinkCrumb(title="", url=""),
         )
 
+    def teardown(self) -> None:
+        """Teardown the handler.
+
+        This method stops the Ruff servers used to format signatures, if any,
+        stores formatted signatures in the cache directory, if enabled,
+        and deletes the rendered fragments this build did not use from it.
+        It also reports where build time went, if profiling is enabled.
+        """
+        rendering._stop_ruff_servers()
+        _logger.debug(
+            f"Options: {self._options_hits} cache hits, {self._options_misses} cache misses, "
+            f"{len(self._options)} distinct sets of options",
+        )
+        rendered = self._rendering_memo
+        _logger.debug(f"Rendered objects: {rendered.hits} cache hits, {rendered.misses} cache misses")
+        memo = rendering._signatures_memo
+        _logger.debug(f"Formatted signatures: {memo.hits} cache hits, {memo.misses} cache misses")
+        if self._signatures_cache is not None:
+            memo.dump(self._signatures_cache)
+        if self._fragments_cache is not None:
+            self._fragments_cache.prune()
+        if self._profiler is not None:
+            _logger.info(f"Build profile (slowest first):\n{self._profiler.table()}")
+            try:
+                self._profiler.dump(self._profile_path)  # type: ignore[arg-type]
+            except OSError as error:
+                _logger.warning(f"Could not write build profile to {self._profile_path}: {error}")
+
     def update_env(self, config: Any) -> None:  # noqa: ARG002
         """Update the Jinja environment with custom filters and tests.
 
@@ -336,6 +703,11 @@ class PythonHandler(BaseHandler):
         self.env.trim_blocks = True
         self.env.lstrip_blocks = True
         self.env.keep_trailing_newline = False
+        self.env.template_class = rendering._MemoizingTemplate
+        if self._templates_cache is not None:
+            with suppress(OSError):
+                self._templates_cache.mkdir(parents=True, exist_ok=True)
+                self.env.bytecode_cache = FileSystemBytecodeCache(str(self._templates_cache))
         self.env.filters["split_path"] = rendering.do_split_path
         self.env.filters["order_members"] = rendering.do_order_members
         self.env.filters["format_code"] = rendering.do_format_code
@@ -343,7 +715,8 @@ class PythonHandler(BaseHandler):
         self.env.filters["format_attribute"] = rendering.do_format_attribute
         self.env.filters["format_type_alias"] = rendering.do_format_type_alias
         self.env.filters["filter_objects"] = rendering.do_filter_objects
-        self.env.filters["stash_crossref"] = rendering.do_stash_crossref
+        # Each environment gets its own stash, so that renderings don't share keys.
+        self.env.filters["stash_crossref"] = rendering._StashCrossRefFilter()
         self.env.filters["get_template"] = rendering.do_get_template
         self.env.filters["source_location"] = rendering.do_source_location
         self.env.filters["as_attributes_section"] = rendering.do_as_attributes_section
@@ -353,7 +726,14 @@ class PythonHandler(BaseHandler):
         self.env.filters["as_modules_section"] = rendering.do_as_modules_section
         self.env.filters["backlink_tree"] = rendering.do_backlink_tree
         self.env.globals["AutorefsHook"] = rendering.AutorefsHook
-        self.env.tests["existing_template"] = lambda template_name: template_name in self.env.list_templates()
+        # Listing templates walks the template directories: do it once, not at each test.
+        self._templates = rendering._TemplateIndex(self.env)
+        self.env.tests["existing_template"] = self._templates.exists
+        if self._profiler is not None:
+            # Filters implemented as objects (like the crossref stash) keep their identity.
+            for name, func in self.env.filters.items():
+                if inspect.isfunction(func) or inspect.ismethod(func):
+                    self.env.filters[name] = self._profiler.wrap("filter", name, func)
 
     def get_aliases(self, identifier: str) -> tuple[str, ...]:
         """Get the aliases for the given identifier.
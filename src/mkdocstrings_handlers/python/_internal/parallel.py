@@ -0,0 +1,97 @@
+# This module implements the concurrent loading of packages in worker processes.
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import TYPE_CHECKING, Any
+
+from griffe import Extensions, GriffeLoader, builtin_extensions, load_extensions
+from mkdocstrings import get_logger
+
+from mkdocstrings_handlers.python._internal.cache import _Pickler, _Unpickler
+
+if TYPE_CHECKING:
+    from griffe import Module
+
+
+_logger = get_logger(__name__)
+
+
+def _can_load_concurrently(extensions: list[str | dict[str, Any]]) -> bool:
+    # Extensions can keep state across packages and hooks, which would be lost in worker processes:
+    # packages are loaded concurrently only when built-in extensions alone are configured.
+    return all((ext if isinstance(ext, str) else next(iter(ext))) in builtin_extensions for ext in extensions)
+
+
+class _WorkerExtensions(Extensions):
+    # `on_package` hooks run in the main process instead,
+    # once packages are merged back and their exports and wildcard imports expanded.
+    def call(self, event: str, **kwargs: Any) -> None:
+        if event != "on_package":
+            super().call(event, **kwargs)
+
+
+class _WorkerLoader(GriffeLoader):
+    # Exports can reference packages loaded by other workers:
+    # they are expanded once all packages are merged back.
+    def expand_exports(self, module: Module, seen: set | None = None) -> None:
+        pass
+
+
+def _load_package_data(module_name: str, find_stubs_package: bool, **loader_kwargs: Any) -> bytes:  # noqa: FBT001
+    # Runs in a worker process. Every package loaded there is returned,
+    # since the requested package can reference objects of other packages.
+    extensions = loader_kwargs.pop("extensions")
+    worker_extensions = _WorkerExtensions(*load_extensions(*extensions)._extensions)
+    loader = _WorkerLoader(extensions=worker_extensions, **loader_kwargs)
+    loader.load(module_name, try_relative_path=False, find_stubs_package=find_stubs_package)
+    packages = list(loader.modules_collection.members.values())
+    lines = dict(loader.lines_collection.items())
+    file = BytesIO()
+    _Pickler(file, packages, loader.modules_collection, loader.lines_collection).dump((packages, lines))
+    return file.getvalue()
+
+
+def _load_packages_concurrently(
+    loader: GriffeLoader,
+    module_names: list[str],
+    *,
+    workers: int,
+    find_stubs_package: bool,
+    **loader_kwargs: Any,
+) -> list[str]:
+    # Load the given packages in worker processes, and merge them into the loader's collections.
+    # Return the names of the packages that could not be loaded this way,
+    # for the caller to load them normally (and report errors).
+    failed = []
+    merged: list[Module] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(module_names))) as executor:
+        futures = {
+            module_name: executor.submit(_load_package_data, module_name, find_stubs_package, **loader_kwargs)
+            for module_name in module_names
+        }
+        for module_name, future in futures.items():
+            try:
+                data = future.result()
+            except Exception as error:  # noqa: BLE001
+                _logger.debug(f"Could not load {module_name} in a worker process: {error}")
+                failed.append(module_name)
+                continue
+            unpickler = _Unpickler(BytesIO(data), loader.modules_collection, loader.lines_collection)
+            packages, lines = unpickler.load()
+            # Packages loaded by several workers are only merged once.
+            for package in packages:
+                if package.path not in loader.modules_collection:
+                    loader.modules_collection.set_member(package.path, package)
+                    merged.append(package)
+            for filepath, file_lines in lines.items():
+                if filepath not in loader.lines_collection:
+                    loader.lines_collection[filepath] = file_lines
+    for package in merged:
+        loader.expand_exports(package)
+    for package in merged:
+        loader.expand_wildcards(package, external=False)
+    for package in merged:
+        loader.extensions.call("on_package", pkg=package, loader=loader)
+    return failed
@@ -0,0 +1,105 @@
+# This module implements an opt-in profiler, recording where build time goes.
+
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from contextlib import AbstractContextManager
+    from pathlib import Path
+
+_T = TypeVar("_T")
+
+# Timings are grouped in categories: collected and rendered identifiers,
+# templates, filters, and phases of the build (loading, alias resolution, etc.).
+_CATEGORIES = ("phase", "collect", "render", "template", "filter")
+
+
+class _Profiler:
+    # Wall times are inclusive: a template's time includes the templates it includes,
+    # and the filters it calls.
+    def __init__(self) -> None:
+        self.timings: dict[tuple[str, str], list[float]] = {}
+
+    def record(self, category: str, name: str, duration: float) -> None:
+        if (timing := self.timings.get((category, name))) is None:
+            self.timings[category, name] = [duration, 1]
+        else:
+            timing[0] += duration
+            timing[1] += 1
+
+    @contextmanager
+    def measure(self, category: str, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, perf_counter() - start)
+
+    def wrap(self, category: str, name: str, func: Callable[..., _T]) -> Callable[..., _T]:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> _T:
+            with self.measure(category, name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def iterate(self, category: str, name: str, iterator: Iterator[_T]) -> Iterator[_T]:
+        # Generators run when iterated: measure their iteration, not their creation.
+        with self.measure(category, name):
+            yield from iterator
+
+    def report(self) -> dict[str, list[dict[str, Any]]]:
+        # Slowest entries first, in each category.
+        report: dict[str, list[dict[str, Any]]] = {category: [] for category in _CATEGORIES}
+        for (category, name), (total, calls) in self.timings.items():
+            report.setdefault(category, []).append(
+                {"name": name, "calls": int(calls), "total": total, "mean": total / calls},
+            )
+        for entries in report.values():
+            entries.sort(key=lambda entry: entry["total"], reverse=True)
+        return report
+
+    def table(self, limit: int = 10) -> str:
+        lines = []
+        for category, entries in self.report().items():
+            if not entries:
+                continue
+            width = max(len(category), *(len(entry["name"]) for entry in entries[:limit]))
+            lines.append(f"{category:<{width}}  {'calls':>8}  {'total (ms)':>12}  {'mean (ms)':>10}")
+            lines.extend(
+                f"{entry['name']:<{width}}  {entry['calls']:>8}  {entry['total'] * 1000:>12.1f}  "
+                f"{entry['mean'] * 1000:>10.2f}"
+                for entry in entries[:limit]
+            )
+            lines.append("")
+        return "\n".join(lines).rstrip()
+
+    def dump(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2), encoding="utf8")
+
+
+_profiler: ContextVar[_Profiler | None] = ContextVar("_profiler", default=None)
+
+
+def _measure(category: str, name: str) -> AbstractContextManager[None]:
+    # Measure with the current profiler, if any.
+    if (profiler := _profiler.get()) is None:
+        return nullcontext()
+    return profiler.measure(category, name)
+
+
+@contextmanager
+def _profiling(profiler: _Profiler | None) -> Iterator[None]:
+    token = _profiler.set(profiler)
+    try:
+        yield
+    finally:
+        _profiler.reset(token)
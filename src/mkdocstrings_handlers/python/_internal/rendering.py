@@ -2,18 +2,31 @@
 
 from __future__ import annotations
 
+import ast
+import hashlib
+import inspect
+import json
+import os
+import pickle
 import random
 import re
 import string
 import subprocess
 import sys
-from collections import defaultdict
-from contextlib import suppress
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from copy import deepcopy
 from dataclasses import replace
-from functools import lru_cache
+from functools import lru_cache, partial
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
+from queue import Queue
 from re import Pattern
 from typing import TYPE_CHECKING, Any, Callable, ClassVar, Literal, TypeVar
+from weakref import WeakKeyDictionary
 
 from griffe import (
     Alias,
@@ -32,15 +45,21 @@ from griffe import (
     Object,
     TypeAlias,
 )
-from jinja2 import pass_context
+from jinja2 import Template, pass_context
 from markupsafe import Markup
 from mkdocs_autorefs import AutorefsHookInterface, Backlink, BacklinkCrumb
 from mkdocstrings import get_logger
 
+from mkdocstrings_handlers.python._internal import profiling
+from mkdocstrings_handlers.python._internal.cache import _tmp_path
+
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator, Sequence
+    from collections.abc import Iterable, Iterator, MutableMapping, Sequence
+    from types import CodeType
+    from xml.etree.ElementTree import Element
 
-    from griffe import Attribute, Class, Function, Module
+    from griffe import Attribute, Class, ExprName, Function, Module
+    from jinja2 import BaseLoader, Environment
     from jinja2.runtime import Context
     from mkdocstrings import CollectorItem
 
@@ -60,13 +79,42 @@ def _sort_key_source(item: CollectorItem) -> float:
     return item.lineno if item.lineno is not None else float("inf")
 
 
+class _ParentOrdering:
+    # Positions of names in the exports of a parent, and memoized orderings of its members.
+    # Both depend on the parent's exports, and are dropped when exports are reassigned.
+    def __init__(self, exports: list[str | ExprName] | None) -> None:
+        self.exports = exports
+        self.length = None if exports is None else len(exports)
+        self.positions: dict[str, int] | None = None
+        if exports is not None:
+            self.positions = {}
+            # Only strings can match names, like with `list.index`.
+            for position, name in enumerate(exports):
+                if isinstance(name, str):
+                    self.positions.setdefault(name, position)
+        self.orderings: dict[tuple[tuple[str, ...], tuple[str, ...]], tuple[int, ...]] = {}
+
+
+_parent_orderings: WeakKeyDictionary[Object | Alias, _ParentOrdering] = WeakKeyDictionary()
+
+
+def _get_parent_ordering(parent: Object | Alias) -> _ParentOrdering:
+    ordering = _parent_orderings.get(parent)
+    exports = parent.exports
+    if (
+        ordering is None
+        or ordering.exports is not exports
+        or ordering.length != (None if exports is None else len(exports))
+    ):
+        ordering = _parent_orderings[parent] = _ParentOrdering(exports)
+    return ordering
+
+
 def _sort__all__(item: CollectorItem) -> float:
-    if item.parent.exports is not None:
-        try:
-            return item.parent.exports.index(item.name)
-        except ValueError:
-            # If the item is not in `__all__`, it will go to the end of the list.
-            return float("inf")
+    positions = _get_parent_ordering(item.parent).positions
+    if positions is not None:
+        # If the item is not in `__all__`, it will go to the end of the list.
+        return positions.get(item.name, float("inf"))
     # No exports declared, refuse to sort (try other methods or return members as they are).
     raise ValueError(f"Parent object {item.parent.path} doesn't declare exports")
 
@@ -103,21 +151,85 @@ def do_format_code(code: str, line_length: int) -> str:
     return formatter(code, line_length)
 
 
-class _StashCrossRefFilter:
-    stash: ClassVar[dict[str, str]] = {}
+class _TemplateIndex:
+    # Names of existing templates, listed once and listed again only when
+    # the loader is replaced or the modification time of a template directory changes
+    # (which happens when templates or directories are added, removed or renamed).
+    def __init__(self, env: Environment) -> None:
+        self.env = env
+        self.loader: BaseLoader | None = None
+        self.names: frozenset[str] = frozenset()
+        self.directories: dict[str, int | None] = {}
 
     @staticmethod
-    def _gen_key(length: int) -> str:
-        return "_" + "".join(random.choice(string.ascii_letters + string.digits) for _ in range(max(2, length - 1)))  # noqa: S311
+    def _stat(directories: Iterable[str]) -> dict[str, int | None]:
+        mtimes: dict[str, int | None] = {}
+        for directory in directories:
+            try:
+                mtimes[directory] = os.stat(directory).st_mtime_ns
+            except OSError:
+                mtimes[directory] = None
+        return mtimes
+
+    def _build(self) -> None:
+        self.loader = self.env.loader
+        self.names = frozenset(self.env.list_templates())
+        # Only file system loaders (possibly wrapped in choice loaders) can be watched.
+        loaders = getattr(self.loader, "loaders", [self.loader])
+        self.directories = self._stat(
+            dirpath
+            for loader in loaders
+            for searchpath in getattr(loader, "searchpath", ())
+            for dirpath, _, _ in os.walk(searchpath, followlinks=getattr(loader, "followlinks", False))
+        )
 
-    def _gen_stash_key(self, length: int) -> str:
-        key = self._gen_key(length)
-        while key in self.stash:
-            key = self._gen_key(length)
-        return key
+    def refresh(self) -> None:
+        if self.loader is not None and (
+            self.loader is not self.env.loader or self._stat(self.directories) != self.directories
+        ):
+            self._build()
+
+    def exists(self, template_name: str) -> bool:
+        if self.loader is not self.env.loader:
+            self._build()
+        return template_name in self.names
+
+
+_crossref_stash: ContextVar[dict[str, str] | None] = ContextVar("_crossref_stash", default=None)
+_visible_members: ContextVar[dict[tuple, list[Object | Alias]] | None] = ContextVar("_visible_members", default=None)
+_docstrings_presence: ContextVar[dict[Object, bool] | None] = ContextVar("_docstrings_presence", default=None)
+
+
+class _StashCrossRefFilter:
+    # Keys are generated from the number of stashed cross-references,
+    # which are popped by the formatting filters after each signature:
+    # the same signature always gets the same keys, and renders to the same HTML.
+    # Within a rendering (see `_isolate_rendering`), cross-references are stashed
+    # in a dictionary local to this rendering, never shared with concurrent ones.
+    alphabet: ClassVar[str] = string.digits + string.ascii_letters
+
+    def __init__(self) -> None:
+        self._stash: dict[str, str] = {}
+
+    @property
+    def stash(self) -> dict[str, str]:
+        if (stash := _crossref_stash.get()) is not None:
+            return stash
+        return self._stash
+
+    @classmethod
+    def _gen_key(cls, index: int, length: int) -> str:
+        digits = []
+        while True:
+            index, digit = divmod(index, len(cls.alphabet))
+            digits.append(cls.alphabet[digit])
+            if not index:
+                break
+        # Keys have the same length as the text they replace, to keep formatting correct.
+        return "_" + "".join(reversed(digits)).ljust(max(2, length - 1), "_")
 
     def __call__(self, crossref: str, *, length: int) -> str:
-        key = self._gen_stash_key(length)
+        key = self._gen_key(len(self.stash), length)
         self.stash[key] = crossref
         return key
 
@@ -126,22 +238,362 @@ do_stash_crossref = _StashCrossRefFilter()
 """Filter to stash cross-references (and restore them after formatting and highlighting)."""
 
 
-def _format_signature(name: Markup, signature: str, line_length: int) -> str:
-    name = str(name).strip()  # type: ignore[assignment]
-    signature = signature.strip()
-    if len(name + signature) < line_length:
-        return name + signature
-
+def _signature_stub(name: str, signature: str) -> str:
     # Black cannot format names with dots, so we replace
     # the whole name with a string of equal length
-    name_length = len(name)
-    formatter = _get_formatter()
-    formatable = f"def {'x' * name_length}{signature}: pass"
-    formatted = formatter(formatable, line_length)
+    return f"def {'x' * len(name)}{signature}: pass"
 
+
+def _unstub_signature(name: str, formatted: str) -> str:
     # We put back the original name
     # and remove starting `def ` and trailing `: pass`
-    return name + formatted[4:-5].strip()[name_length:-1]
+    return name + formatted[4:-5].strip()[len(name) : -1]
+
+
+class _FormattingBatch:
+    # Formatting of code is deferred until the end of a rendering:
+    # filters return placeholders, and all pending code is then formatted at once,
+    # as a single module per line length, before the results are spliced back into the HTML.
+    def __init__(self) -> None:
+        self.token = "mkdocstrings-formatting-" + "".join(random.choices(string.ascii_lowercase, k=8))  # noqa: S311
+        self.items: list[tuple[str, int, Callable[[str], str]]] = []
+
+    def defer(self, code: str, line_length: int, finish: Callable[[str], str]) -> str:
+        self.items.append((code, line_length, finish))
+        return f"{self.token}-{len(self.items) - 1}"
+
+    def apply(self, html: str) -> str:
+        if not self.items:
+            return html
+        results = [finish(formatted) for formatted, (_, _, finish) in zip(self._format(), self.items)]
+        return re.sub(rf"{self.token}-(\d+)", lambda match: results[int(match.group(1))], html)
+
+    def _format(self) -> list[str]:
+        formatter = _get_formatter()
+        formatted = [code for code, _, _ in self.items]
+        batches = defaultdict(list)
+        # Black infers target Python versions from the whole code it formats,
+        # so formatting pieces of code together could change the result for each of them.
+        batchable = getattr(formatter, "batchable", False)
+        for index, (code, line_length, _) in enumerate(self.items):
+            # Invalid code would make formatters fail on the whole batch.
+            if batchable and _is_valid_code(code):
+                batches[line_length].append(index)
+            else:
+                formatted[index] = formatter(code, line_length)
+
+        for line_length, indexes in batches.items():
+            # Each piece of code is preceded by a comment, used to split the formatted module.
+            module = "".join(f"# {self.token} {index}\n{self.items[index][0]}\n" for index in indexes)
+            parts = re.split(rf"^# {self.token} (\d+)\n", formatter(module, line_length), flags=re.MULTILINE)
+            chunks = {int(index): chunk.strip("\n") + "\n" for index, chunk in zip(parts[1::2], parts[2::2])}
+            if list(chunks) != indexes:
+                _logger.debug("Could not split formatted code, formatting pieces of code one by one")
+                chunks = {index: formatter(self.items[index][0], line_length) for index in indexes}
+            for index in indexes:
+                formatted[index] = chunks[index]
+        return formatted
+
+
+def _is_valid_code(code: str) -> bool:
+    try:
+        ast.parse(code)
+    except SyntaxError:
+        return False
+    return True
+
+
+_formatting_batch: ContextVar[_FormattingBatch | None] = ContextVar("_formatting_batch", default=None)
+
+
+@contextmanager
+def _batch_formatting() -> Iterator[_FormattingBatch]:
+    batch = _FormattingBatch()
+    token = _formatting_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _formatting_batch.reset(token)
+
+
+def _format_code_later(code: str, line_length: int, finish: Callable[[str], str]) -> str:
+    # Format code and finish it now, or later if formatting is batched.
+    if (batch := _formatting_batch.get()) is not None:
+        return batch.defer(code, line_length, finish)
+    return finish(_get_formatter()(code, line_length))
+
+
+class _RenderedMember:
+    # HTML of a member template, with what its rendering did besides producing HTML:
+    # the headings it registered, and the code it deferred for formatting (if any).
+    def __init__(
+        self,
+        html: str,
+        config: Any,
+        headings: list[Element],
+        batch: _FormattingBatch | None,
+        items: range,
+    ) -> None:
+        self.html = html
+        # Keep options alive, since keys hold their identity.
+        self.config = config
+        self.headings = headings
+        self.batch = batch
+        self.items = items
+
+
+class _RenderingMemo:
+    # HTML of member templates rendered during a build, keyed by the variables
+    # these templates document as their context: the object itself, `root`, `root_members`,
+    # `heading_level`, `config` and `locale`. Options are interned by the handler,
+    # so the same options are the same object.
+    def __init__(self, headings: list[Element], maxsize: int = 1000) -> None:
+        self.headings = headings
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple, _RenderedMember] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, template: Template, render: Callable[[Context], Iterator[str]], context: Context) -> Iterator[str]:
+        kind = template.name and template.name.removesuffix(".html.jinja")
+        if kind not in _memoized_templates or (obj := context.get(kind)) is None:
+            yield from render(context)
+            return
+        config = context.get("config")
+        key = (
+            template.name,
+            obj,
+            context.get("root"),
+            context.get("root_members"),
+            context.get("heading_level"),
+            id(config),
+            context.get("locale"),
+        )
+        if (entry := self.entries.get(key)) is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            yield self._replay(entry)
+            return
+        self.misses += 1
+        first_heading = len(self.headings)
+        batch = _formatting_batch.get()
+        first_item = len(batch.items) if batch else 0
+        html = "".join(render(context))
+        self.entries[key] = _RenderedMember(
+            html,
+            config,
+            [deepcopy(heading) for heading in self.headings[first_heading:]],
+            batch,
+            range(first_item, len(batch.items) if batch else 0),
+        )
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        yield html
+
+    def _replay(self, entry: _RenderedMember) -> str:
+        self.headings.extend(deepcopy(heading) for heading in entry.headings)
+        if entry.batch is None or entry.batch is _formatting_batch.get():
+            return entry.html
+        # Placeholders refer to the batch of another rendering: defer the same code again.
+        batch = entry.batch
+        replacements = {index: _format_code_later(*batch.items[index]) for index in entry.items}
+        return re.sub(
+            rf"{batch.token}-(\d+)",
+            lambda match: replacements.get(int(match.group(1)), match.group()),
+            entry.html,
+        )
+
+
+_memoized_templates = frozenset(("attribute", "class", "function", "module", "type_alias"))
+
+_rendering_memo: ContextVar[_RenderingMemo | None] = ContextVar("_rendering_memo", default=None)
+
+
+class _MemoizingTemplate(Template):
+    # Templates whose rendering goes through the current memo, if any,
+    # and is measured by the current profiler, if any.
+    # Includes, imports and inheritance all call `root_render_func`.
+    @classmethod
+    def from_code(
+        cls,
+        environment: Environment,
+        code: CodeType,
+        globals: MutableMapping[str, Any],  # noqa: A002
+        uptodate: Callable[[], bool] | None = None,
+    ) -> Template:
+        template = super().from_code(environment, code, globals, uptodate)
+        render = template.root_render_func
+
+        def root_render_func(context: Context) -> Iterator[str]:
+            if (memo := _rendering_memo.get()) is None:
+                rendered = render(context)
+            else:
+                rendered = memo.render(template, render, context)
+            if (profiler := profiling._profiler.get()) is not None:
+                return profiler.iterate("template", template.name or "<string>", rendered)
+            return rendered
+
+        template.root_render_func = root_render_func
+        return template
+
+
+@contextmanager
+def _isolate_rendering() -> Iterator[None]:
+    # State local to a rendering: stashed cross-references, visible members,
+    # and whether objects have docstrings (collected objects do not change while rendering).
+    # Headings are not: they are registered in the handler's list, shared by all renderings.
+    tokens = (_crossref_stash.set({}), _visible_members.set({}), _docstrings_presence.set({}))
+    try:
+        yield
+    finally:
+        _crossref_stash.reset(tokens[0])
+        _visible_members.reset(tokens[1])
+        _docstrings_presence.reset(tokens[2])
+
+
+@contextmanager
+def _memoize_rendering(memo: _RenderingMemo) -> Iterator[None]:
+    token = _rendering_memo.set(memo)
+    try:
+        yield
+    finally:
+        _rendering_memo.reset(token)
+
+
+def _pop_stash(env: Environment) -> dict[str, str]:
+    stash = env.filters["stash_crossref"].stash
+    items = dict(stash)
+    stash.clear()
+    return items
+
+
+def _highlight_signature(env: Environment, signature: str, name_class: str | None) -> str:
+    signature = str(
+        env.filters["highlight"](
+            Markup.escape(signature),
+            language="python",
+            inline=False,
+            classes=["doc-signature"],
+            linenums=False,
+        ),
+    )
+
+    # Pygments does not see the name of the object as such
+    # (see comments in the filters below): we fix its CSS class.
+    if name_class and not re.search(rf'<span class="{name_class}">', signature):
+        signature = re.sub(r'<span class="[a-z]{1,2}">', f'<span class="{name_class}">', signature, count=1)
+
+    return signature
+
+
+def _restore_crossrefs(signature: str, stash: dict[str, str]) -> str:
+    # Replace every key in a single pass, with one alternation pattern
+    # (cached by `re` since the same keys come back again and again).
+    if not stash:
+        return signature
+    pattern = re.compile(rf"\b(?:{'|'.join(map(re.escape, stash))})\b")
+    return pattern.sub(lambda match: stash[match.group()], signature)
+
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class _SignaturesMemo:
+    # LRU cache of formatted and highlighted signatures, before cross-references are restored.
+    # Keys contain the code, line length, formatter (with its configuration) and highlighting options.
+    # Entries can be stored on the disk and loaded back in later builds.
+    maxsize: ClassVar[int] = 5000
+
+    def __init__(self) -> None:
+        self.entries: OrderedDict[tuple, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, env: Environment, code: str, line_length: int, name_class: str | None) -> tuple:
+        formatter = _get_formatter()
+        # The filter can be wrapped, for example when profiling.
+        highlighter = getattr(inspect.unwrap(env.filters["highlight"]), "__self__", None)
+        # Options holding collections (like `extend_pygments_lang`) are serialized to be hashable.
+        highlight_options = sorted(
+            (name, value if isinstance(value, _SCALARS) else json.dumps(value, sort_keys=True, default=str))
+            for name, value in (vars(highlighter) if highlighter is not None else {}).items()
+            if isinstance(value, (*_SCALARS, dict, list, tuple))
+        )
+        return (code, line_length, name_class, getattr(formatter, "identity", None), *highlight_options)
+
+    def get(self, key: tuple) -> str | None:
+        if (value := self.entries.get(key)) is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: tuple, value: str) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def load(self, path: Path) -> None:
+        try:
+            with path.open("rb") as file:
+                pygments_version, entries = pickle.load(file)  # noqa: S301
+        except FileNotFoundError:
+            return
+        except Exception as error:  # noqa: BLE001
+            _logger.debug(f"Could not load signatures from cache: {error}")
+            return
+        # Highlighted code can change between Pygments versions.
+        if pygments_version == _package_version("pygments"):
+            for key, value in entries.items():
+                self.entries.setdefault(key, value)
+
+    def dump(self, path: Path) -> None:
+        tmp_path = _tmp_path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("wb") as file:
+                pickle.dump((_package_version("pygments"), dict(self.entries)), file, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(path)
+        except Exception as error:  # noqa: BLE001
+            _logger.debug(f"Could not store signatures in cache: {error}")
+            tmp_path.unlink(missing_ok=True)
+
+
+_signatures_memo = _SignaturesMemo()
+
+
+def _format_and_highlight(
+    env: Environment,
+    code: str,
+    line_length: int,
+    name_class: str | None,
+    *,
+    name: str | None = None,
+) -> str:
+    # Format code if it's too long, then highlight it and restore cross-references.
+    # When a name is given, the code is a function signature, formatted as a `def` statement.
+    stash = _pop_stash(env)
+    full_code = (name or "") + code
+    key = _signatures_memo.key(env, full_code, line_length, name_class)
+    if (signature := _signatures_memo.get(key)) is not None:
+        return _restore_crossrefs(signature, stash)
+
+    def finish(formatted: str) -> str:
+        signature = _highlight_signature(env, formatted, name_class)
+        _signatures_memo.set(key, signature)
+        return _restore_crossrefs(signature, stash)
+
+    if len(full_code) < line_length:
+        return finish(full_code)
+    if name is None:
+        return _format_code_later(code, line_length, finish)
+    return _format_code_later(
+        _signature_stub(name, code),
+        line_length,
+        lambda formatted: finish(_unstub_signature(name, formatted)),
+    )
 
 
 @pass_context
@@ -180,17 +632,6 @@ def do_format_signature(
     signature = type_params_template.render(context.parent, obj=function, signature=True)
     signature += signature_template.render(new_context, function=function, signature=True)
 
-    signature = _format_signature(callable_path, signature, line_length)
-    signature = str(
-        env.filters["highlight"](
-            Markup.escape(signature),
-            language="python",
-            inline=False,
-            classes=["doc-signature"],
-            linenums=False,
-        ),
-    )
-
     # Since we highlight the signature without `def`,
     # Pygments sees it as a function call and not a function definition.
     # The result is that the function name is not parsed as such,
@@ -199,15 +640,7 @@ def do_format_signature(
     # Pygments will set an `fm` (function -> magic) CSS class.
     # To fix this, we replace the CSS class in the first span with `nf`,
     # unless we already found an `nf` span.
-    if not re.search(r'<span class="nf">', signature):
-        signature = re.sub(r'<span class="[a-z]{1,2}">', '<span class="nf">', signature, count=1)
-
-    if stash := env.filters["stash_crossref"].stash:
-        for key, value in stash.items():
-            signature = re.sub(rf"\b{key}\b", value, signature)
-        stash.clear()
-
-    return signature
+    return _format_and_highlight(env, signature.strip(), line_length, "nf", name=str(callable_path).strip())
 
 
 @pass_context
@@ -255,23 +688,7 @@ def do_format_attribute(
         )
         signature += f" = {value}"
 
-    signature = do_format_code(signature, line_length)
-    signature = str(
-        env.filters["highlight"](
-            Markup.escape(signature),
-            language="python",
-            inline=False,
-            classes=["doc-signature"],
-            linenums=False,
-        ),
-    )
-
-    if stash := env.filters["stash_crossref"].stash:
-        for key, value in stash.items():
-            signature = re.sub(rf"\b{key}\b", value, signature)
-        stash.clear()
-
-    return signature
+    return _format_and_highlight(env, signature.strip(), line_length, None)
 
 
 @pass_context
@@ -304,17 +721,6 @@ def do_format_type_alias(
     value = expr_template.render(context.parent, expression=type_alias.value, signature=True)
     signature += f" = {value}"
 
-    signature = do_format_code(signature, line_length)
-    signature = str(
-        env.filters["highlight"](
-            Markup.escape(signature),
-            language="python",
-            inline=False,
-            classes=["doc-signature"],
-            linenums=False,
-        ),
-    )
-
     # Since we highlight the signature without `type`,
     # Pygments sees only an assignment, not a type alias definition
     # (at the moment it does not understand type alias definitions anyway).
@@ -322,15 +728,7 @@ def do_format_type_alias(
     # but instead as a regular name: `n` CSS class instead of `nc`.
     # To fix it, we replace the first occurrence of an `n` CSS class
     # with an `nc` one, unless we found `nc` already.
-    if not re.search(r'<span class="nc">', signature):
-        signature = re.sub(r'<span class="[a-z]{1,2}">', '<span class="nc">', signature, count=1)
-
-    if stash := env.filters["stash_crossref"].stash:
-        for key, value in stash.items():
-            signature = re.sub(rf"\b{key}\b", value, signature)
-        stash.clear()
-
-    return signature
+    return _format_and_highlight(env, signature.strip(), line_length, "nc")
 
 
 def do_order_members(
@@ -357,6 +755,23 @@ def do_order_members(
         return sorted_members
     if isinstance(order, str):
         order = [order]
+
+    # Orderings are memoized for members of a same parent, by their names
+    # (explicit members lists were handled above and do not matter here).
+    # Inherited members are aliases whose parent is the inheriting class, so they share it too:
+    # only members gathered from several parents are sorted on every call.
+    parent = members[0].parent if members and isinstance(members[0], (Object, Alias)) else None
+    if parent is None or any(member.parent is not parent for member in members):
+        return _order_members(members, order)
+    memo = _get_parent_ordering(parent).orderings
+    key = (tuple(order), tuple(member.name for member in members))
+    if (permutation := memo.get(key)) is None:
+        positions = {id(member): position for position, member in enumerate(members)}
+        permutation = memo[key] = tuple(positions[id(member)] for member in _order_members(members, order))
+    return [members[position] for position in permutation]
+
+
+def _order_members(members: Sequence[Object | Alias], order: list[Order]) -> Sequence[Object | Alias]:
     for method in order:
         with suppress(ValueError):
             return sorted(members, key=_order_map[method])
@@ -406,29 +821,107 @@ def do_split_path(path: str, full_path: str) -> Iterator[tuple[str, str, str, st
         first = False
 
 
-def _keep_object(name: str, filters: Sequence[tuple[Pattern, bool]]) -> bool:
-    keep = None
-    rules = set()
-    for regex, exclude in filters:
-        rules.add(exclude)
-        if regex.search(name):
-            keep = not exclude
-    if keep is None:
+# Inline global flags, like `(?i)`, apply to a whole pattern and cannot be combined with other patterns:
+# Python 3.10 applies them to the combined pattern (with a deprecation warning), later versions refuse to compile it.
+_global_flags_re = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+class _FilterMatcher:
+    # Filters are evaluated in order, and the last one matching a name decides.
+    # When possible, they are combined into a single regular expression
+    # that tries them from last to first, the first successful branch
+    # recording which filter matched. Decisions are memoized per name.
+    def __init__(self, filters: Sequence[tuple[Pattern, bool]]) -> None:
+        self.filters = list(filters)
         # When we only include stuff, no match = reject.
         # When we only exclude stuff, or include and exclude stuff, no match = keep.
-        return rules != {False}
-    return keep
+        self.default = any(exclude for _, exclude in self.filters)
+        self.combined = self._combine(self.filters)
+        self.memo: dict[str, bool] = {}
+
+    @staticmethod
+    def _combine(filters: list[tuple[Pattern, bool]]) -> Pattern | None:
+        # Patterns with groups (they could be referenced by number),
+        # with inline global flags or with different flags are evaluated separately.
+        if any(
+            regex.groups or regex.flags != filters[0][0].flags or _global_flags_re.search(regex.pattern)
+            for regex, _ in filters
+        ):
+            return None
+        branches = [
+            rf"(?=(?s:.*?)(?:{regex.pattern}))(?P<_{index}>)"
+            for index, (regex, _) in reversed(list(enumerate(filters)))
+        ]
+        return re.compile(rf"\A(?:{'|'.join(branches)})", filters[0][0].flags)
+
+    def _match(self, name: str) -> bool:
+        if self.combined is not None:
+            if match := self.combined.match(name):
+                return not self.filters[int(match.lastgroup[1:])][1]  # type: ignore[index]
+            return self.default
+        for regex, exclude in reversed(self.filters):
+            if regex.search(name):
+                return not exclude
+        return self.default
+
+    def keep(self, name: str) -> bool:
+        try:
+            return self.memo[name]
+        except KeyError:
+            keep = self.memo[name] = self._match(name)
+            return keep
+
+
+@lru_cache(maxsize=128)
+def _get_filter_matcher(filters: tuple[tuple[Pattern, bool], ...]) -> _FilterMatcher:
+    # Compiled patterns are hashable (by pattern and flags),
+    # so matchers are shared by all options with the same filters.
+    return _FilterMatcher(filters)
 
 
-def _parents(obj: Alias) -> set[str]:
-    parents = {obj.path}
-    parent = obj.parent
-    while parent is not None:
-        parents.add(parent.path)
-        if isinstance(parent, Alias):
-            parents.add(parent.final_target.path)
-        parent = parent.parent
-    return parents
+_ancestries: WeakKeyDictionary[Object | Alias, frozenset[str]] = WeakKeyDictionary()
+
+
+def _ancestry(obj: Object | Alias) -> frozenset[str]:
+    # Paths of the object and its parents, as well as the targets of aliases among them.
+    # Ancestries are cached for each object, so that each parent chain is walked once.
+    # Resolution errors are not cached: they are raised again for each alias.
+    try:
+        return _ancestries[obj]
+    except KeyError:
+        pass
+    paths = {obj.path}
+    if isinstance(obj, Alias):
+        paths.add(obj.final_target.path)
+    if obj.parent is not None:
+        paths |= _ancestry(obj.parent)
+    ancestry = _ancestries[obj] = frozenset(paths)
+    return ancestry
+
+
+def _has_docstrings(obj: Object | Alias) -> bool:
+    # Same as `has_docstrings`, memoized during a rendering: each check walks
+    # the members of the object recursively, and templates check members at each level.
+    if (memo := _docstrings_presence.get()) is None:
+        return obj.has_docstrings
+    if isinstance(obj, Alias):
+        try:
+            obj = obj.final_target
+        except (AliasResolutionError, CyclicAliasError):
+            return False
+    if obj.has_docstring or not obj.members:
+        return obj.has_docstring
+    if (present := memo.get(obj)) is None:
+        present = memo[obj] = any(_member_has_docstrings(member) for member in obj.members.values())
+    return present
+
+
+def _member_has_docstrings(member: Object | Alias) -> bool:
+    # Checking docstrings first is cheaper: most members are neither imported nor aliases.
+    try:
+        return _has_docstrings(member) and (not member.is_imported or member.is_public)
+    except AliasResolutionError:
+        return False
 
 
 def _remove_cycles(objects: list[Object | Alias]) -> Iterator[Object | Alias]:
@@ -436,7 +929,9 @@ def _remove_cycles(objects: list[Object | Alias]) -> Iterator[Object | Alias]:
     for obj in objects:
         if isinstance(obj, Alias):
             with suppress_errors:
-                if obj.final_target.path in _parents(obj):
+                if obj.final_target.path == obj.path or (
+                    obj.parent is not None and obj.final_target.path in _ancestry(obj.parent)
+                ):
                     continue
         yield obj
 
@@ -465,6 +960,38 @@ def do_filter_objects(
     Returns:
         A list of objects.
     """
+    # Summaries and children templates filter the same members with the same options:
+    # during a rendering, the visible members of each set of members are computed once.
+    filter_objects = partial(
+        _filter_objects,
+        objects_dictionary,
+        filters=filters,
+        members_list=members_list,
+        inherited_members=inherited_members,
+        keep_no_docstrings=keep_no_docstrings,
+    )
+    if (visible := _visible_members.get()) is None:
+        return filter_objects()
+    key = (
+        tuple(objects_dictionary.values()),
+        filters if isinstance(filters, str) or filters is None else tuple(filters),
+        members_list if isinstance(members_list, (bool, type(None))) else tuple(members_list),
+        inherited_members if isinstance(inherited_members, bool) else tuple(inherited_members),
+        keep_no_docstrings,
+    )
+    if (objects := visible.get(key)) is None:
+        objects = visible[key] = filter_objects()
+    return list(objects)
+
+
+def _filter_objects(
+    objects_dictionary: dict[str, Object | Alias],
+    *,
+    filters: Sequence[tuple[Pattern, bool]] | Literal["public"] | None,
+    members_list: bool | list[str] | None,
+    inherited_members: bool | list[str],
+    keep_no_docstrings: bool,
+) -> list[Object | Alias]:
     inherited_members_specified = False
     if inherited_members is True:
         # Include all inherited members.
@@ -497,11 +1024,10 @@ def do_filter_objects(
     if filters == "public":
         objects = [obj for obj in objects if obj.is_public]
     elif filters:
-        objects = [
-            obj for obj in objects if _keep_object(obj.name, filters) or (inherited_members_specified and obj.inherited)
-        ]
+        matcher = _get_filter_matcher(tuple(filters))
+        objects = [obj for obj in objects if matcher.keep(obj.name) or (inherited_members_specified and obj.inherited)]
     if not keep_no_docstrings:
-        objects = [obj for obj in objects if obj.has_docstrings or (inherited_members_specified and obj.inherited)]
+        objects = [obj for obj in objects if _has_docstrings(obj) or (inherited_members_specified and obj.inherited)]
 
     # Prevent infinite recursion.
     if objects:
@@ -535,6 +1061,11 @@ def _get_ruff_formatter() -> Callable[[str, int], str] | None:
         ruff_bin = "ruff"
 
     def formatter(code: str, line_length: int) -> str:
+        # Prefer a long-lived server, and spawn a process per call if the server is not usable.
+        if (server := _get_ruff_server(ruff_bin, line_length)) is not None:
+            formatted = server.format(code)
+            if formatted is not None:
+                return formatted
         try:
             completed_process = subprocess.run(  # noqa: S603
                 [
@@ -556,9 +1087,228 @@ def _get_ruff_formatter() -> Callable[[str, int], str] | None:
         else:
             return completed_process.stdout
 
+    # Ruff formats each statement of a module independently of the others.
+    formatter.batchable = True  # type: ignore[attr-defined]
+    # Only the line length is overridden: other settings (like the quote style) come from the configuration.
+    config = hashlib.sha256(_ruff_config(Path.cwd()).encode()).hexdigest()
+    formatter.identity = f"ruff {_package_version('ruff')} {config}"  # type: ignore[attr-defined]
     return formatter
 
 
+_RUFF_CONFIG_FILES = (".ruff.toml", "ruff.toml", "pyproject.toml")
+
+
+def _ruff_config(directory: Path) -> str:
+    # Contents of the configuration file used by Ruff to format code in the given directory:
+    # the closest `.ruff.toml`, `ruff.toml`, or `pyproject.toml` with a `[tool.ruff]` table,
+    # else the user configuration file, if any.
+    user_directory = Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config") / "ruff"
+    for parent in (directory, *directory.parents, user_directory):
+        for name in _RUFF_CONFIG_FILES:
+            try:
+                contents = parent.joinpath(name).read_text(encoding="utf8")
+            except OSError:
+                continue
+            if name != "pyproject.toml" or "[tool.ruff" in contents:
+                return contents
+    return ""
+
+
+class _RuffServer:
+    # A long-lived `ruff server` process, formatting code through the Language Server Protocol.
+    # Requests go through a bounded queue, consumed by a single thread owning the process,
+    # which is restarted when it crashes. After too many consecutive failures, the server is disabled
+    # and `format` returns None, letting callers fall back to spawning a process per call.
+    max_failures: ClassVar[int] = 3
+    queue_size: ClassVar[int] = 64
+    timeout: ClassVar[float] = 10
+
+    def __init__(self, ruff_bin: str, line_length: int) -> None:
+        self.ruff_bin = ruff_bin
+        self.line_length = line_length
+        self.disabled = False
+        self._failures = 0
+        self._process: subprocess.Popen | None = None
+        self._encoding = "utf-16"
+        self._request_id = 0
+        self._document = (Path.cwd() / "file.py").as_uri()
+        self._queue: Queue[tuple[str, Future[str]] | None] = Queue(maxsize=self.queue_size)
+        self._thread = threading.Thread(target=self._run, name=f"ruff-server-{line_length}", daemon=True)
+        self._thread.start()
+
+    def format(self, code: str) -> str | None:
+        if self.disabled:
+            return None
+        future: Future[str] = Future()
+        self._queue.put((code, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except Exception as error:  # noqa: BLE001
+            _logger.debug(f"Ruff server failed to format code: {error}")
+            # Killing the process unblocks the thread, which restarts it on the next request.
+            self._kill()
+            return None
+
+    def stop(self) -> None:
+        self.disabled = True
+        self._queue.put(None)
+        self._thread.join(timeout=self.timeout)
+        self._kill()
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            code, future = item
+            if self.disabled:
+                future.set_exception(RuntimeError("Ruff server is disabled"))
+                continue
+            # A server that crashed since the previous request is restarted once.
+            restart = self._process is not None
+            while True:
+                try:
+                    if self._process is None:
+                        self._start()
+                    future.set_result(self._format(code))
+                except Exception as error:  # noqa: BLE001
+                    self._kill()
+                    if restart:
+                        restart = False
+                        continue
+                    self._failures += 1
+                    if self._failures >= self.max_failures:
+                        _logger.debug("Disabling Ruff server after too many failures")
+                        self.disabled = True
+                    if not future.done():
+                        future.set_exception(error)
+                else:
+                    self._failures = 0
+                break
+
+    def _start(self) -> None:
+        self._process = subprocess.Popen(  # noqa: S603
+            [self.ruff_bin, "server"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        cwd = Path.cwd()
+        result = self._request(
+            "initialize",
+            {
+                "processId": os.getpid(),
+                "rootUri": cwd.as_uri(),
+                "workspaceFolders": [{"uri": cwd.as_uri(), "name": cwd.name}],
+                "capabilities": {"general": {"positionEncodings": ["utf-32", "utf-16"]}},
+                "initializationOptions": {"settings": {"lineLength": self.line_length}},
+            },
+        )
+        self._encoding = result.get("capabilities", {}).get("positionEncoding", "utf-16")
+        self._notify("initialized", {})
+
+    def _kill(self) -> None:
+        if (process := self._process) is not None:
+            self._process = None
+            with suppress(OSError):
+                process.kill()
+                process.wait()
+            for pipe in (process.stdin, process.stdout):
+                with suppress(OSError):
+                    pipe.close()  # type: ignore[union-attr]
+
+    def _format(self, code: str) -> str:
+        self._notify(
+            "textDocument/didOpen",
+            {"textDocument": {"uri": self._document, "languageId": "python", "version": 1, "text": code}},
+        )
+        try:
+            edits = self._request(
+                "textDocument/formatting",
+                {"textDocument": {"uri": self._document}, "options": {"tabSize": 4, "insertSpaces": True}},
+            )
+        except ValueError:
+            # Invalid code: the server reports an error, but keeps running.
+            return code
+        finally:
+            self._notify("textDocument/didClose", {"textDocument": {"uri": self._document}})
+        return self._apply_edits(code, edits or [])
+
+    def _apply_edits(self, code: str, edits: list[dict[str, Any]]) -> str:
+        lines = code.splitlines(keepends=True)
+        offsets = [0]
+        for line in lines:
+            offsets.append(offsets[-1] + len(line))
+
+        def offset(position: dict[str, int]) -> int:
+            if position["line"] >= len(lines):
+                return len(code)
+            line = lines[position["line"]]
+            character = position["character"]
+            if self._encoding == "utf-16":
+                character = len(line.encode("utf-16-le")[: character * 2].decode("utf-16-le", errors="ignore"))
+            elif self._encoding == "utf-8":
+                character = len(line.encode()[:character].decode(errors="ignore"))
+            return offsets[position["line"]] + character
+
+        for edit in sorted(edits, key=lambda edit: offset(edit["range"]["start"]), reverse=True):
+            start, end = offset(edit["range"]["start"]), offset(edit["range"]["end"])
+            code = code[:start] + edit["newText"] + code[end:]
+        return code
+
+    def _send(self, message: dict[str, Any]) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        stdin = self._process.stdin  # type: ignore[union-attr]
+        stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)  # type: ignore[union-attr]
+        stdin.flush()  # type: ignore[union-attr]
+
+    def _receive(self) -> dict[str, Any]:
+        stdout = self._process.stdout  # type: ignore[union-attr]
+        length = None
+        while (line := stdout.readline()) not in {b"\r\n", b""}:  # type: ignore[union-attr]
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        if length is None:
+            raise EOFError("Ruff server closed its output")
+        return json.loads(stdout.read(length))  # type: ignore[union-attr]
+
+    def _notify(self, method: str, params: dict[str, Any]) -> None:
+        self._send({"method": method, "params": params})
+
+    def _request(self, method: str, params: dict[str, Any]) -> Any:
+        self._request_id += 1
+        self._send({"id": self._request_id, "method": method, "params": params})
+        while True:
+            message = self._receive()
+            if "method" in message:
+                # Requests from the server are answered with an empty result, notifications are ignored.
+                if "id" in message:
+                    self._send({"id": message["id"], "result": None})
+                continue
+            if message.get("id") == self._request_id:
+                if "error" in message:
+                    raise ValueError(message["error"].get("message"))
+                return message.get("result")
+
+
+_ruff_servers: dict[tuple[str, int], _RuffServer] = {}
+_ruff_servers_lock = threading.Lock()
+
+
+def _get_ruff_server(ruff_bin: str, line_length: int) -> _RuffServer | None:
+    # One server per line length, since it is configured when starting the server.
+    with _ruff_servers_lock:
+        if (server := _ruff_servers.get((ruff_bin, line_length))) is None:
+            server = _ruff_servers[(ruff_bin, line_length)] = _RuffServer(ruff_bin, line_length)
+    return None if server.disabled else server
+
+
+def _stop_ruff_servers() -> None:
+    with _ruff_servers_lock:
+        servers = list(_ruff_servers.values())
+        _ruff_servers.clear()
+    for server in servers:
+        server.stop()
+
+
 def _get_black_formatter() -> Callable[[str, int], str] | None:
     try:
         from black import InvalidInput, Mode, format_str  # noqa: PLC0415
@@ -572,9 +1322,17 @@ def _get_black_formatter() -> Callable[[str, int], str] | None:
         except InvalidInput:
             return code
 
+    formatter.identity = f"black {_package_version('black')}"  # type: ignore[attr-defined]
     return formatter
 
 
+def _package_version(name: str) -> str:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return ""
+
+
 def do_get_template(obj: Object | Alias) -> str:
     """Get the template name used to render an object.
 
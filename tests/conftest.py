@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from collections.abc import Iterator
+from functools import partial
 from typing import TYPE_CHECKING
 
 import pytest
@@ -10,7 +11,7 @@ import pytest
 from tests import helpers
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Callable, Iterator
     from pathlib import Path
 
     from markdown.core import Markdown
@@ -77,6 +78,19 @@ def fixture_handler(plugin: MkdocstringsPlugin, ext_markdown: Markdown) -> Pytho
     return helpers.handler(plugin, ext_markdown)
 
 
+@pytest.fixture(name="make_handler")
+def fixture_make_handler(tmp_path: Path) -> Callable[..., PythonHandler]:
+    """Return a function creating handler instances without MkDocs, in a temporary directory.
+
+    Parameters:
+        tmp_path: Pytest fixture.
+
+    Returns:
+        A function accepting the global configuration of the handler.
+    """
+    return partial(helpers.make_handler, tmp_path)
+
+
 # --------------------------------------------
 # Session-scoped fixtures.
 # --------------------------------------------
@@ -9,6 +9,8 @@ from typing import TYPE_CHECKING, Any
 from markdown.core import Markdown
 from mkdocs.config.defaults import MkDocsConfig
 
+from mkdocstrings_handlers.python import PythonConfig, PythonHandler
+
 if TYPE_CHECKING:
     from collections.abc import Iterator
     from pathlib import Path
@@ -16,8 +18,6 @@ if TYPE_CHECKING:
     import pytest
     from mkdocstrings import MkdocstringsPlugin
 
-    from mkdocstrings_handlers.python import PythonHandler
-
 
 @contextmanager
 def mkdocs_conf(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[MkDocsConfig]:
@@ -95,3 +95,25 @@ def handler(plugin: MkdocstringsPlugin, ext_markdown: Markdown) -> PythonHandler
     handler = plugin.handlers.get_handler("python")
     handler._update_env(ext_markdown)
     return handler  # type: ignore[return-value]
+
+
+def make_handler(base_dir: Path, **config: Any) -> PythonHandler:
+    """Return a handler instance created without MkDocs, with its Jinja environment set up.
+
+    Parameters:
+        base_dir: The directory that relative paths of the configuration are relative to.
+        **config: The global configuration of the handler.
+
+    Returns:
+        A handler instance.
+    """
+    handler = PythonHandler(
+        theme="material",
+        custom_templates=None,
+        base_dir=base_dir,
+        config=PythonConfig.from_data(**config),
+        mdx=["toc"],
+        mdx_config={},
+    )
+    handler._update_env(Markdown(), config={})
+    return handler
@@ -50,6 +50,7 @@ def _render(handler: PythonHandler, package: TmpPackage, final_options: dict[str
         # This is not thread-safe, but pytest-xdist uses subprocesses, so it's fine.
         handler._modules_collection = ModulesCollection()
         handler._lines_collection = LinesCollection()
+        handler._loaders = {}
         handler._paths = []
 
     html = handler.render(data, options)
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+import json
 import os
+import re
 import sys
 from dataclasses import replace
 from glob import glob
 from io import BytesIO
 from pathlib import Path
 from textwrap import dedent
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
 
 import bs4
 import mkdocstrings
@@ -18,6 +22,7 @@ from griffe import (
     Docstring,
     DocstringSectionExamples,
     DocstringSectionKind,
+    GriffeLoader,
     Module,
     temporary_inspected_module,
     temporary_visited_module,
@@ -25,8 +30,12 @@ from griffe import (
 from mkdocstrings import CollectionError
 
 from mkdocstrings_handlers.python import Inventory, PythonConfig, PythonHandler, PythonOptions
+from mkdocstrings_handlers.python._internal import cache, rendering
+from mkdocstrings_handlers.python._internal import handler as handler_module
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from mkdocstrings import MkdocstringsPlugin
 
 
@@ -177,6 +186,58 @@ def test_rendering_object_source_without_lineno(handler: PythonHandler) -> None:
         assert handler.render(module, PythonOptions(show_source=True))
 
 
+def test_memoize_formatted_signatures(handler: PythonHandler, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Assert formatted and highlighted signatures are reused across objects."""
+    code = dedent(
+        """
+        class Base:
+            def method(self, first_parameter: int, second_parameter: str, third_parameter: float) -> None: ...
+
+        class Child(Base):
+            def method(self, first_parameter: int, second_parameter: str, third_parameter: float) -> None: ...
+        """,
+    )
+    monkeypatch.setattr(rendering, "_signatures_memo", rendering._SignaturesMemo())
+    options = PythonOptions(
+        show_root_heading=True,
+        separate_signature=True,
+        signature_crossrefs=True,
+        show_signature_annotations=True,
+    )
+    with temporary_visited_module(code) as module:
+        base = handler.render(module["Base.method"], options)
+        assert rendering._signatures_memo.hits == 0
+        child = handler.render(module["Child.method"], options)
+        assert rendering._signatures_memo.hits == 1
+    assert 'backlink-anchor="module.Base.method"' in base
+    assert 'backlink-anchor="module.Child.method"' in child
+    signature = re.compile(r'<div class="doc-signature.*?</div>', re.DOTALL)
+    assert signature.search(base).group().replace("Base", "Child") == signature.search(child).group()  # type: ignore[union-attr]
+
+
+def test_memoize_rendered_members(handler: PythonHandler) -> None:
+    """Assert members rendered again in the same context reuse their HTML and register the same headings."""
+    code = dedent(
+        """
+        class Thing:
+            def method(self, first_parameter: int, second_parameter: str, third_parameter: float) -> None:
+                '''A method.'''
+        """,
+    )
+    options = handler.get_options({"show_root_heading": True, "separate_signature": True})
+    with temporary_visited_module(code) as module:
+        first = handler.render(module["Thing"], options)
+        first_headings = [heading.attrib["id"] for heading in handler.get_headings()]
+        misses = handler._rendering_memo.misses
+        second = handler.render(module["Thing"], options)
+        second_headings = [heading.attrib["id"] for heading in handler.get_headings()]
+    assert handler._rendering_memo.misses == misses
+    assert handler._rendering_memo.hits == 1
+    assert first == second
+    assert first_headings == second_headings == ["module.Thing", "module.Thing.method"]
+    assert "first_parameter" in first
+
+
 def test_give_precedence_to_user_paths() -> None:
     """Assert user paths take precedence over default paths."""
     last_sys_path = sys.path[-1]
@@ -408,3 +469,450 @@ def test_no_environment_path_in_source_labels(
     assert set(labels) == {expected_label}
     # The source bodies themselves are still rendered.
     assert "model_attribute" in html
+
+
+def test_cache_compiled_templates(tmp_path: Path, make_handler: Callable[..., PythonHandler]) -> None:
+    """Assert compiled templates are stored in the cache directory."""
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    handler.env.get_template("module.html.jinja")
+    assert list(tmp_path.joinpath(".cache", "templates").glob("jinja-*/__jinja2_*.cache"))
+
+
+def test_reuse_rendered_fragments(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_handler: Callable[..., PythonHandler],
+) -> None:
+    """Assert unchanged objects are not rendered again, their headings are registered again, and unused ones deleted."""
+    package = tmp_path / "src" / "pkg"
+    package.mkdir(parents=True)
+    package.joinpath("__init__.py").write_text("class Thing:\n    '''A thing.'''\n", encoding="utf8")
+    fragments = tmp_path / ".cache" / "fragments"
+
+    def _render(handler: PythonHandler) -> tuple[str, list[str]]:
+        options = handler.get_options({"show_root_heading": True})
+        html = handler.render(handler.collect("pkg.Thing", options), options)
+        handler.teardown()
+        return html, [heading.attrib["id"] for heading in handler.get_headings()]
+
+    html, headings = _render(make_handler(paths=["src"], cache_dir=".cache"))
+    assert headings == ["pkg.Thing"]
+
+    # Aliases of reused headings are computed again, from other packages as well.
+    dep = tmp_path / "src" / "dep"
+    dep.mkdir()
+    dep.joinpath("__init__.py").write_text("from pkg import Thing\n__all__ = ['Thing']\n", encoding="utf8")
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    handler.collect("dep", handler.get_options({}))
+    with monkeypatch.context() as patch:
+        patch.setattr(handler.env, "get_template", None)
+        assert _render(handler) == (html, headings)
+    assert handler.get_aliases("pkg.Thing") == ("pkg.Thing", "dep.Thing")
+
+    package.joinpath("__init__.py").write_text("class Thing:\n    '''A new thing.'''\n", encoding="utf8")
+    new_html, _ = _render(make_handler(paths=["src"], cache_dir=".cache"))
+    assert "A new thing." in new_html
+    assert len(list(fragments.glob("*.pickle"))) == 1
+
+
+def test_profile_build(tmp_path: Path, make_handler: Callable[..., PythonHandler]) -> None:
+    """Assert build time is reported per phase, identifier, template and filter when profiling is enabled."""
+    package = tmp_path / "src" / "pkg"
+    package.mkdir(parents=True)
+    package.joinpath("__init__.py").write_text("def thing(a: int) -> None:\n    '''A thing.'''\n", encoding="utf8")
+    handler = make_handler(paths=["src"], profile="profile.json")
+    options = handler.get_options({"show_root_heading": True, "separate_signature": True})
+    handler.render(handler.collect("pkg.thing", options), options)
+    handler.teardown()
+
+    report = json.loads(tmp_path.joinpath("profile.json").read_text(encoding="utf8"))
+    names = {category: [entry["name"] for entry in entries] for category, entries in report.items()}
+    assert names["collect"] == names["render"] == ["pkg.thing"]
+    assert {"load packages", "resolve aliases", "render templates", "format signatures"} <= set(names["phase"])
+    assert "function.html.jinja" in names["template"]
+    assert {"format_signature", "highlight", "convert_markdown"} <= set(names["filter"])
+    totals = [entry["total"] for entry in report["template"]]
+    assert totals == sorted(totals, reverse=True)
+    assert all(entry["calls"] >= 1 for entries in report.values() for entry in entries)
+
+
+def test_key_signatures_on_highlighting_options_when_profiling(make_handler: Callable[..., PythonHandler]) -> None:
+    """Assert profiled filters still give access to highlighting options, to memoize signatures."""
+    handler = make_handler()
+    profiled_handler = make_handler(profile="profile.json")
+    assert profiled_handler.env.filters["highlight"] is not handler.env.filters["highlight"]
+    key = rendering._signatures_memo.key(handler.env, "def thing(): ...", 60, "nf")
+    assert len(key) > 4
+    assert rendering._signatures_memo.key(profiled_handler.env, "def thing(): ...", 60, "nf") == key
+
+
+def test_index_inventories(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_handler: Callable[..., PythonHandler],
+) -> None:
+    """Assert inventories are indexed once in the cache directory, and indexed again when they change."""
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    handler.config = replace(handler.config, inventories=[Inventory(url="https://example.com/objects.inv")])
+    url, config = handler.get_inventory_urls()[0]
+
+    inventory = mkdocstrings.Inventory()
+    inventory.register(name="lib.Thing", domain="py", role="class", uri="api/#lib.Thing")
+    inventory.register(name="lib thing", domain="std", role="label", uri="usage/#lib-thing")
+    expected = [("lib.Thing", "https://example.com/api/#lib.Thing")]
+    assert list(handler.load_inventory(BytesIO(inventory.format_sphinx()), url, **config)) == expected
+    assert list(tmp_path.joinpath(".cache", "inventories").glob("*.index"))
+
+    with monkeypatch.context() as patch:
+        patch.setattr(cache, "_parse_inventory", None)
+        assert list(handler.load_inventory(BytesIO(inventory.format_sphinx()), url, **config)) == expected
+        config = {**config, "domains": ["std"]}
+        expected = [("lib thing", "https://example.com/usage/#lib-thing")]
+        assert list(handler.load_inventory(BytesIO(inventory.format_sphinx()), url, **config)) == expected
+
+    inventory.register(name="lib other", domain="std", role="label", uri="usage/#lib-other")
+    expected.append(("lib other", "https://example.com/usage/#lib-other"))
+    assert sorted(handler.load_inventory(BytesIO(inventory.format_sphinx()), url, **config)) == sorted(expected)
+    assert len(list(tmp_path.joinpath(".cache", "inventories").glob("*.inv"))) == 1
+    assert len(list(tmp_path.joinpath(".cache", "inventories").glob("*.index"))) == 1
+
+
+def test_store_inventories(monkeypatch: pytest.MonkeyPatch, make_handler: Callable[..., PythonHandler]) -> None:
+    """Assert downloaded inventories are stored in the cache directory, and their local copies used offline."""
+    inventory = mkdocstrings.Inventory()
+    inventory.register(name="lib.Thing", domain="py", role="class", uri="api/#lib.Thing")
+    expected = [("lib.Thing", "https://example.com/api/#lib.Thing")]
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    inventories = [Inventory(url="https://example.com/objects.inv"), Inventory(url="https://other.com/objects.inv")]
+    handler.config = replace(handler.config, inventories=inventories[:1])
+    [(url, config)] = handler.get_inventory_urls()
+    assert url == "https://example.com/objects.inv"
+    assert list(handler.load_inventory(BytesIO(inventory.format_sphinx()), url, **config)) == expected
+
+    # Recent copies are read instead of downloading them again, along with their index.
+    [(url, config)] = handler.get_inventory_urls()
+    assert url.startswith("file://")
+    assert config["base_url"] == "https://example.com"
+    with monkeypatch.context() as patch:
+        patch.setattr(cache, "_parse_inventory", None)
+        path = Path(url2pathname(urlsplit(url).path))
+        assert list(handler.load_inventory(BytesIO(path.read_bytes()), url, **config)) == expected
+
+    # Outdated copies are downloaded again.
+    os.utime(path, (0, 0))
+    assert handler.get_inventory_urls()[0][0] == "https://example.com/objects.inv"
+
+    # Offline, outdated copies are used, and remote inventories without local copies are skipped,
+    # including inventories with credentials, which are never stored.
+    local = Inventory(url="file:///docs/objects.inv")
+    private = Inventory(url="https://${TOKEN}@private.com/objects.inv")
+    handler.config = replace(handler.config, inventories=[*inventories, private, local], offline=True)
+    assert handler.get_inventory_urls() == [
+        (url, config),
+        (local.url, {**local._config, "index_dir": config["index_dir"]}),
+    ]
+
+
+def test_load_packages_from_cache(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_handler: Callable[..., PythonHandler],
+) -> None:
+    """Assert unchanged packages are loaded from the on-disk cache."""
+    package = tmp_path / "src" / "pkg"
+    package.mkdir(parents=True)
+    package.joinpath("__init__.py").write_text("from pkg.sub import Thing\n__all__ = ['Thing']\n", encoding="utf8")
+    package.joinpath("sub.py").write_text("class Thing:\n    '''A thing.'''\n", encoding="utf8")
+
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    handler.collect("pkg.Thing", handler.get_options({}))
+    assert tmp_path.joinpath(".cache", "modules", "pkg.pickle").exists()
+
+    loaded = []
+    load = GriffeLoader.load
+
+    def _load(self: GriffeLoader, objspec: str, /, **kwargs: Any) -> Any:
+        loaded.append(objspec)
+        return load(self, objspec, **kwargs)
+
+    monkeypatch.setattr(GriffeLoader, "load", _load)
+
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    thing = handler.collect("pkg.Thing", handler.get_options({}))
+    assert not loaded
+    assert thing.docstring.value == "A thing."
+    assert thing.source.startswith("class Thing:")
+
+    package.joinpath("sub.py").write_text("class Thing:\n    '''A new thing.'''\n", encoding="utf8")
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    thing = handler.collect("pkg.Thing", handler.get_options({}))
+    assert not loaded
+    assert thing.docstring.value == "A new thing."
+
+    package.joinpath("other.py").write_text("", encoding="utf8")
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    handler.collect("pkg.Thing", handler.get_options({}))
+    assert loaded == ["pkg"]
+
+
+def test_load_dependent_packages_from_cache(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_handler: Callable[..., PythonHandler],
+) -> None:
+    """Assert packages importing from each other are loaded from the on-disk cache."""
+    dep = tmp_path / "src" / "dep"
+    dep.mkdir(parents=True)
+    dep.joinpath("__init__.py").write_text(
+        "from pkg.util import helper\nclass Base:\n    '''A base.'''\n__all__ = ['Base', 'helper']\n",
+        encoding="utf8",
+    )
+    pkg = tmp_path / "src" / "pkg"
+    pkg.mkdir()
+    pkg.joinpath("__init__.py").write_text(
+        "from dep import Base\nclass Child(Base):\n    '''A child.'''\n__all__ = ['Base', 'Child']\n",
+        encoding="utf8",
+    )
+    pkg.joinpath("util.py").write_text("def helper():\n    '''Help.'''\n", encoding="utf8")
+
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    handler.collect("pkg.Child", handler.get_options({"preload_modules": ["dep"]}))
+
+    loaded = []
+    load = GriffeLoader.load
+
+    def _load(self: GriffeLoader, objspec: str, /, **kwargs: Any) -> Any:
+        loaded.append(objspec)
+        return load(self, objspec, **kwargs)
+
+    monkeypatch.setattr(GriffeLoader, "load", _load)
+
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    child = handler.collect("pkg.Child", handler.get_options({"preload_modules": ["dep"]}))
+    assert not loaded
+    assert child.resolved_bases == [handler._modules_collection["dep.Base"]]
+    assert list(handler._modules_collection["dep.Base"].aliases) == ["pkg.Base"]
+    assert list(handler._modules_collection["pkg.util.helper"].aliases) == ["dep.helper"]
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "from dep import *\n",
+        "import dep\n__all__ = []\n__all__ += dep.__all__\n",
+    ],
+)
+def test_reload_cached_packages_when_dependencies_change(
+    tmp_path: Path,
+    make_handler: Callable[..., PythonHandler],
+    code: str,
+) -> None:
+    """Assert cached packages are loaded again when the packages they import from change.
+
+    Parameters:
+        code: Code of the package, expanded against the other package (parametrized).
+    """
+    dep = tmp_path / "src" / "dep"
+    dep.mkdir(parents=True)
+    dep.joinpath("__init__.py").write_text("class A:\n    '''A.'''\n__all__ = ['A']\n", encoding="utf8")
+    pkg = tmp_path / "src" / "pkg"
+    pkg.mkdir()
+    pkg.joinpath("__init__.py").write_text(code, encoding="utf8")
+
+    def names() -> set[str]:
+        handler = make_handler(paths=["src"], cache_dir=".cache")
+        package = handler.collect("pkg", handler.get_options({"preload_modules": ["dep"]}))
+        return {*package.members, *(package.exports or ())} & {"A", "B"}
+
+    assert names() == {"A"}
+    dep.joinpath("__init__.py").write_text(
+        "class A:\n    '''A.'''\nclass B:\n    '''B.'''\n__all__ = ['A', 'B']\n",
+        encoding="utf8",
+    )
+    assert names() == {"A", "B"}
+
+
+def test_revisit_changed_modules(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_handler: Callable[..., PythonHandler],
+) -> None:
+    """Assert only changed modules and the modules pointing into them are visited again."""
+    package = tmp_path / "src" / "pkg"
+    package.mkdir(parents=True)
+    package.joinpath("__init__.py").write_text("from pkg.sub import *\n", encoding="utf8")
+    package.joinpath("sub.py").write_text("class Thing:\n    '''A thing.'''\n", encoding="utf8")
+    package.joinpath("other.py").write_text("class Other:\n    '''Another thing.'''\n", encoding="utf8")
+
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    handler.collect("pkg", handler.get_options({}))
+
+    visited = []
+    visit = cache.visit
+
+    def _visit(module_name: str, /, **kwargs: Any) -> Any:
+        visited.append(module_name)
+        return visit(module_name, **kwargs)
+
+    monkeypatch.setattr(cache, "visit", _visit)
+
+    package.joinpath("sub.py").write_text("class Thing:\n    '''A thing.'''\nclass New:\n    pass\n", encoding="utf8")
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    pkg = handler.collect("pkg", handler.get_options({}))
+    assert "New" in pkg.members
+    assert pkg["New"].target_path == "pkg.sub.New"
+    assert pkg["other"].path == "pkg.other"
+    assert visited == ["pkg", "sub"]
+
+    package.joinpath("sub.py").write_text("class Thing(:\n", encoding="utf8")
+    handler = make_handler(paths=["src"], cache_dir=".cache")
+    pkg = handler.collect("pkg", handler.get_options({}))
+    assert "sub" not in pkg.members
+
+
+def test_load_packages_concurrently(tmp_path: Path, make_handler: Callable[..., PythonHandler]) -> None:
+    """Assert packages loaded in worker processes are merged and cross-referenced."""
+    for name, code in {
+        "dep": "__all__ = ['Thing']\nclass Thing:\n    '''A thing.'''\n",
+        "pkg": "import dep\nfrom dep import *\n__all__ = []\n__all__ += dep.__all__\n",
+    }.items():
+        tmp_path.joinpath(name).mkdir()
+        tmp_path.joinpath(name, "__init__.py").write_text(code, encoding="utf8")
+    handler = make_handler(collection_workers=2)
+    pkg = handler.collect("pkg", handler.get_options({"preload_modules": ["dep"]}))
+    assert pkg.exports == ["Thing"]
+    assert pkg["Thing"].docstring.value == "A thing."
+    assert handler._lines_collection[tmp_path / "dep" / "__init__.py"]
+
+
+def test_load_dataclasses_concurrently(tmp_path: Path, make_handler: Callable[..., PythonHandler]) -> None:
+    """Assert `on_package` hooks run once packages loaded in worker processes are merged."""
+    for name, code in {
+        "dep": "from dataclasses import dataclass\n@dataclass\nclass Base:\n    a: int\n",
+        "pkg": "from dataclasses import dataclass\nfrom dep import Base\n@dataclass\nclass Child(Base):\n    b: int\n",
+    }.items():
+        tmp_path.joinpath(name).mkdir()
+        tmp_path.joinpath(name, "__init__.py").write_text(code, encoding="utf8")
+    handler = make_handler(collection_workers=2)
+    child = handler.collect("pkg.Child", handler.get_options({"preload_modules": ["dep"]}))
+    assert [parameter.name for parameter in child.parameters] == ["self", "a", "b"]
+
+
+def test_load_packages_sequentially_with_extensions(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_handler: Callable[..., PythonHandler],
+) -> None:
+    """Assert packages are not loaded in worker processes when non-built-in extensions are configured."""
+    for name in ("one", "two"):
+        tmp_path.joinpath(f"{name}.py").write_text(f"def {name}(): ...\n", encoding="utf8")
+    tmp_path.joinpath("extension.py").write_text(
+        "import griffe\nclass Extension(griffe.Extension): ...\n",
+        encoding="utf8",
+    )
+    monkeypatch.setattr(handler_module, "_load_packages_concurrently", None)
+    handler = make_handler(collection_workers=2)
+    options = handler.get_options({"preload_modules": ["one"], "extensions": ["extension.py"]})
+    assert handler.collect("two.two", options).name == "two"
+
+
+def test_preload_identifiers(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_handler: Callable[..., PythonHandler],
+) -> None:
+    """Assert identifiers are preloaded with a single alias resolution pass."""
+    for name in ("one", "two"):
+        tmp_path.joinpath(f"{name}.py").write_text(f"def {name}():\n    '''Function {name}.'''\n", encoding="utf8")
+    handler = make_handler()
+
+    resolutions = []
+    resolve_aliases = GriffeLoader.resolve_aliases
+
+    def _resolve_aliases(self: GriffeLoader, **kwargs: Any) -> Any:
+        resolutions.append(kwargs)
+        return resolve_aliases(self, **kwargs)
+
+    monkeypatch.setattr(GriffeLoader, "resolve_aliases", _resolve_aliases)
+
+    handler.preload(["one.one", "two", "two.two", "missing.thing"])
+    assert len(resolutions) == 1
+    options = handler.get_options({})
+    assert handler.collect("one.one", options).docstring.value == "Function one."
+    assert handler.collect("two.two", options).docstring.value == "Function two."
+    assert len(resolutions) == 1
+    with pytest.raises(CollectionError):
+        handler.collect("missing.thing", options)
+
+
+def test_reuse_loaders(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_handler: Callable[..., PythonHandler],
+) -> None:
+    """Assert loaders are reused across packages collected with the same options."""
+    for name in ("one", "two", "three"):
+        tmp_path.joinpath(f"{name}.py").write_text(f"def {name}(): ...\n", encoding="utf8")
+    handler = make_handler()
+
+    loaders = []
+    init = GriffeLoader.__init__
+
+    def _init(self: GriffeLoader, **kwargs: Any) -> None:
+        loaders.append(self)
+        init(self, **kwargs)
+
+    monkeypatch.setattr(GriffeLoader, "__init__", _init)
+
+    handler.collect("one", handler.get_options({}))
+    handler.collect("two", handler.get_options({}))
+    assert len(loaders) == 1
+    handler.collect("three", handler.get_options({"docstring_style": "numpy"}))
+    assert len(loaders) == 2
+
+
+def test_intern_options(handler: PythonHandler) -> None:
+    """Assert identical local options share the same options instance."""
+    options = handler.get_options({"show_source": False, "filters": ["!^_"]})
+    assert handler.get_options({"filters": ["!^_"], "show_source": False}) is options
+    assert handler.get_options({"show_source": True, "filters": ["!^_"]}) is not options
+    assert handler._options_hits == 1
+    assert handler._options_misses == 2
+
+
+def test_reuse_parsed_docstrings(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_handler: Callable[..., PythonHandler],
+) -> None:
+    """Assert docstrings collected again with other parser settings are parsed once per settings."""
+    tmp_path.joinpath("module.py").write_text(
+        "def function(a):\n    '''Summary.\n\n    Parameters:\n        a: Google-style.\n    '''\n",
+        encoding="utf8",
+    )
+    handler = make_handler()
+
+    parsed = []
+    parse = Docstring.parse
+
+    def _parse(self: Docstring, *args: Any, **kwargs: Any) -> Any:
+        parsed.append(self.parser)
+        return parse(self, *args, **kwargs)
+
+    monkeypatch.setattr(Docstring, "parse", _parse)
+
+    google = handler.get_options({"docstring_style": "google"})
+    numpy = handler.get_options({"docstring_style": "numpy"})
+    handler.collect("module", google)
+    docstring = handler.collect("module.function", google).docstring
+    assert parsed == []
+    google_sections = docstring.parsed
+    assert [section.kind.value for section in google_sections] == ["text", "parameters"]
+
+    handler.collect("module.function", numpy)
+    assert [section.kind.value for section in docstring.parsed] == ["text"]
+    handler.collect("module.function", google)
+    assert docstring.parsed is google_sections
+    handler.collect("module.function", numpy)
+    assert [section.kind.value for section in docstring.parsed] == ["text"]
+    assert parsed == ["google", "numpy"]
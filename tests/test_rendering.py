@@ -3,16 +3,19 @@
 from __future__ import annotations
 
 import re
+from contextlib import ExitStack
+from contextvars import copy_context
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Callable, cast
 
 import pytest
-from griffe import Alias, ModulesCollection, Object, temporary_visited_module
+from griffe import Alias, ModulesCollection, Object, temporary_visited_module, temporary_visited_package
+from jinja2 import Environment, FileSystemLoader
 
 from mkdocstrings_handlers.python._internal import rendering
 
 if TYPE_CHECKING:
-    from markupsafe import Markup
+    from pathlib import Path
 
 
 @pytest.mark.parametrize(
@@ -40,18 +43,163 @@ def test_format_code(code: str, formatter: Callable[[str, int], str]) -> None:
         assert formatter(code, length)
 
 
+def test_restart_ruff_server() -> None:
+    """Assert the Ruff server is restarted after crashing."""
+    formatter = rendering._get_ruff_formatter()
+    assert formatter is not None
+    code = "aaaaa(bbbbb, ccccc=1) + ddddd.eeeee[ffff] or {ggggg: hhhhh, iiiii: jjjjj}"
+    expected = formatter(code, 20)
+    try:
+        server = rendering._get_ruff_server("ruff", 20)
+        assert server is not None
+        assert server.format(code) == expected
+        server._process.kill()  # type: ignore[union-attr]
+        server._process.wait()  # type: ignore[union-attr]
+        assert formatter(code, 20) == expected
+        assert server.format(code) == expected
+        assert server.format("def (:") == "def (:"
+    finally:
+        rendering._stop_ruff_servers()
+
+
 @pytest.mark.parametrize(
     ("name", "signature"),
     [("Class.method", "(param: str = 'hello') -> 'OtherClass'")],
 )
-def test_format_signature(name: Markup, signature: str) -> None:
-    """Assert signatures can be formatted.
+def test_format_signature(name: str, signature: str) -> None:
+    """Assert signatures can be formatted as `def` statements, in batches.
 
     Parameters:
+        name: Name of the function.
         signature: Signature to format.
     """
     for length in (5, 100):
-        assert rendering._format_signature(name, signature, length)
+        with rendering._batch_formatting() as batch:
+            placeholder = rendering._format_code_later(
+                rendering._signature_stub(name, signature),
+                length,
+                lambda formatted: rendering._unstub_signature(name, formatted),
+            )
+        formatted = batch.apply(placeholder)
+        assert formatted.startswith(f"{name}(")
+        assert formatted.endswith('-> "OtherClass"')
+        assert ("\n" in formatted) is (length < len(name + signature))
+
+
+class _Highlighter:
+    def __init__(self, **options: Any) -> None:
+        vars(self).update(options)
+
+    def highlight(self, src: str) -> str:
+        return src
+
+
+def test_signatures_memo_key_highlight_options() -> None:
+    """Assert signatures are highlighted again when highlighting options change, including collections."""
+    memo = rendering._SignaturesMemo()
+    env = Environment(autoescape=True)
+    keys = set()
+    for languages in ({}, {"name": "pycon"}, {"name": "python"}):
+        env.filters["highlight"] = _Highlighter(md=object(), extend_pygments_lang=languages).highlight
+        keys.add(memo.key(env, "def function(): ...", 60, "nf"))
+    assert len(keys) == 3
+
+
+def test_find_ruff_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Assert the configuration Ruff uses to format code is found, to format signatures again when it changes."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    project = tmp_path / "project"
+    docs = project / "docs"
+    docs.mkdir(parents=True)
+    assert rendering._ruff_config(docs) == ""
+    tmp_path.joinpath("config", "ruff").mkdir(parents=True)
+    tmp_path.joinpath("config", "ruff", "ruff.toml").write_text("line-length = 100\n", encoding="utf8")
+    assert rendering._ruff_config(docs) == "line-length = 100\n"
+    project.joinpath("pyproject.toml").write_text("[project]\nname = 'project'\n", encoding="utf8")
+    assert rendering._ruff_config(docs) == "line-length = 100\n"
+    project.joinpath("pyproject.toml").write_text("[tool.ruff.format]\nquote-style = 'single'\n", encoding="utf8")
+    assert rendering._ruff_config(docs) == "[tool.ruff.format]\nquote-style = 'single'\n"
+    docs.joinpath("ruff.toml").write_text("[format]\nquote-style = 'double'\n", encoding="utf8")
+    assert rendering._ruff_config(docs) == "[format]\nquote-style = 'double'\n"
+
+
+@pytest.mark.parametrize(
+    "formatter",
+    [
+        rendering._get_black_formatter(),
+        rendering._get_ruff_formatter(),
+    ],
+)
+def test_batch_formatting(formatter: Callable[[str, int], str], monkeypatch: pytest.MonkeyPatch) -> None:
+    """Assert code formatted in batches is formatted as if formatted alone.
+
+    Parameters:
+        formatter: Formatter to use.
+    """
+    monkeypatch.setattr(rendering, "_get_formatter", lambda: formatter)
+    codes = [
+        ("def xxxxxxxxx(*, return_type: bool = False, name: str | None = None) -> str: pass", 40),
+        ("aaaaa(bbbbb, ccccc=1) + ddddd.eeeee[ffff] or {ggggg: hhhhh, iiiii: jjjjj}", 30),
+        ("def xxxxx(a, /, b=f'{c}', *args, d: int = 1_000, **kwargs): pass", 30),
+        ("def invalid(:", 5),
+    ]
+    with rendering._batch_formatting() as batch:
+        html = " ".join(
+            rendering._format_code_later(code, line_length, lambda formatted: f"<{formatted}>")
+            for code, line_length in codes
+        )
+    assert batch.apply(html) == " ".join(f"<{formatter(code, line_length)}>" for code, line_length in codes)
+
+
+def test_stash_crossref_keys() -> None:
+    """Assert stash keys are deterministic, unique, and as long as the text they replace."""
+    stash_filter = rendering._StashCrossRefFilter()
+    lengths = [1, 2, 3, 8, *([3] * 100)]
+    keys = [stash_filter(f"crossref {index}", length=length) for index, length in enumerate(lengths)]
+    assert len(set(keys)) == len(keys)
+    assert all(len(key) == max(3, length) for key, length in zip(keys, lengths))
+    assert all(re.fullmatch(r"_\w+", key) for key in keys)
+    stash_filter.stash.clear()
+    assert [stash_filter(f"crossref {index}", length=length) for index, length in enumerate(lengths)] == keys
+
+
+def test_isolate_renderings() -> None:
+    """Assert interleaved renderings stash cross-references and defer formatting separately."""
+    stash_filter = rendering._StashCrossRefFilter()
+    contexts = [copy_context(), copy_context()]
+    stacks = [ExitStack(), ExitStack()]
+    batches = []
+    for context, stack in zip(contexts, stacks):
+        context.run(stack.enter_context, rendering._isolate_rendering())
+        batches.append(context.run(stack.enter_context, rendering._batch_formatting()))
+
+    # Each rendering generates the same keys, in its own stash.
+    keys = [context.run(stash_filter, f"crossref {index}", length=3) for index, context in enumerate(contexts)]
+    assert keys[0] == keys[1]
+    stashes = [context.run(lambda: stash_filter.stash) for context in contexts]
+    assert stashes == [{keys[0]: "crossref 0"}, {keys[1]: "crossref 1"}]
+
+    for index, context in enumerate(contexts):
+        context.run(rendering._format_code_later, f"code{index}", 60, str)
+    assert [[code for code, _, _ in batch.items] for batch in batches] == [["code0"], ["code1"]]
+
+    for context, stack in zip(contexts, stacks):
+        context.run(stack.close)
+    assert stash_filter.stash == {}
+    assert rendering._formatting_batch.get() is None
+
+
+def test_template_index(tmp_path: Path) -> None:
+    """Assert templates are listed once, and listed again when template directories change."""
+    tmp_path.joinpath("lang").mkdir()
+    tmp_path.joinpath("a.html.jinja").write_text("", encoding="utf8")
+    index = rendering._TemplateIndex(Environment(loader=FileSystemLoader(tmp_path), autoescape=True))
+    assert index.exists("a.html.jinja")
+    assert not index.exists("lang/b.html.jinja")
+    tmp_path.joinpath("lang", "b.html.jinja").write_text("", encoding="utf8")
+    assert not index.exists("lang/b.html.jinja")
+    index.refresh()
+    assert index.exists("lang/b.html.jinja")
 
 
 @dataclass
@@ -83,6 +231,122 @@ def test_filter_objects(names: list[str], filter_params: dict[str, Any], expecte
     assert set(filtered_names) == set(expected_names)
 
 
+def test_filter_cyclic_aliases() -> None:
+    """Assert aliases pointing to one of their parents are filtered out, and others kept."""
+    with temporary_visited_package(
+        "pkg",
+        {
+            "__init__.py": "from pkg.sub import Thing",
+            "sub.py": "class Thing:\n    from pkg import sub\n    from pkg import Thing\n    from pkg.other import Other",
+            "other.py": "class Other: ...",
+        },
+    ) as package:
+        thing = package["sub.Thing"]
+        for _ in range(2):
+            filtered = rendering.do_filter_objects(thing.members)
+            assert [member.name for member in filtered] == ["Other"]
+        filtered = rendering.do_filter_objects(package.members["Thing"].members)
+        assert "Thing" not in {member.name for member in filtered}
+
+
+def test_filter_visible_members_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Assert members are filtered once per rendering, with the same results as outside renderings."""
+    code = """
+        from os import path
+        from os import sep as sep
+
+        class Undocumented:
+            def method(self): ...
+
+        class Nested:
+            class Inner:
+                def method(self):
+                    '''Documented.'''
+
+        def function():
+            '''Documented.'''
+    """
+    with temporary_visited_module(code) as module:
+        expected = rendering.do_filter_objects(module.members, keep_no_docstrings=False)
+        assert [member.name for member in expected] == ["Nested", "function"]
+
+        calls = []
+        filter_objects = rendering._filter_objects
+
+        def _filter_objects(*args: Any, **kwargs: Any) -> list:
+            calls.append(args)
+            return filter_objects(*args, **kwargs)
+
+        monkeypatch.setattr(rendering, "_filter_objects", _filter_objects)
+        with rendering._isolate_rendering():
+            for _ in range(2):
+                assert rendering.do_filter_objects(module.members, keep_no_docstrings=False) == expected
+            assert rendering.do_filter_objects(module.members, keep_no_docstrings=True) != expected
+        assert len(calls) == 2
+        for obj in module.members.values():
+            with rendering._isolate_rendering():
+                assert rendering._has_docstrings(obj) is obj.has_docstrings
+
+
+def test_ordering_members_by_exports() -> None:
+    """Assert members are ordered by `__all__`, and orderings are updated when exports change."""
+    code = "__all__ = ['c', 'a']\n\ndef a(): ...\ndef b(): ...\ndef c(): ...\n"
+    with temporary_visited_module(code) as module:
+        members = [member for member in module.members.values() if member.is_function]
+        for _ in range(2):
+            ordered = rendering.do_order_members(members, "__all__", None)
+            assert [member.name for member in ordered] == ["c", "a", "b"]
+        module.exports = ["b", "a", "c"]
+        ordered = rendering.do_order_members(members, "__all__", None)
+        assert [member.name for member in ordered] == ["b", "a", "c"]
+        module.exports = None
+        ordered = rendering.do_order_members(members, ["__all__", "alphabetical"], None)
+        assert [member.name for member in ordered] == ["a", "b", "c"]
+
+
+def test_memoize_inherited_members_ordering() -> None:
+    """Assert inherited members share the inheriting class as parent, so their ordering is memoized."""
+    code = "class Base:\n    def b(self): ...\n    def a(self): ...\n\nclass Child(Base):\n    def c(self): ...\n"
+    with temporary_visited_module(code) as module:
+        child = module["Child"]
+        members = list(child.all_members.values())
+        assert all(member.parent is child for member in members)
+        ordered = rendering.do_order_members(members, "alphabetical", None)
+        assert [member.name for member in ordered] == ["a", "b", "c"]
+        assert rendering._parent_orderings[child].orderings
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        ["!^_[^_]", "^__init__$"],
+        ["^_", "!^__", "^__init__$"],
+        ["!^_", "(?i)^A"],
+        ["^a", "(?i)^B"],
+        ["(?u)^a", "^B"],
+        ["!^(_)\\1"],
+        ["^a", "b$"],
+    ],
+)
+def test_filter_matcher(filters: list[str]) -> None:
+    """Assert combined filters give the same results as filters applied one after the other.
+
+    Parameters:
+        filters: Filters to apply, as they are written in options.
+    """
+    compiled = [(re.compile(filtr.removeprefix("!")), filtr.startswith("!")) for filtr in filters]
+    matcher = rendering._FilterMatcher(compiled)
+    for name in ("_private", "__dunder__", "__init__", "public", "Abc", "ab", "A", "b", "", "___"):
+        keep = None
+        for regex, exclude in compiled:
+            if regex.search(name):
+                keep = not exclude
+        if keep is None:
+            keep = any(exclude for _, exclude in compiled)
+        assert matcher.keep(name) is keep
+        assert matcher.memo[name] is keep
+
+
 @pytest.mark.parametrize(
     ("members", "inherited_members", "expected_names"),
     [